@@ -12,8 +12,19 @@ API_TOKEN = os.getenv("GUARDIANS_API_TOKEN")
 GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", API_TOKEN)
 GITHUB_ACCESS_TOKEN = os.getenv("GITHUB_ACCESS_TOKEN")
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR / 'guardians.db'}")
+STORAGE_CACHE_TTL = float(os.getenv("GUARDIANS_CACHE_TTL", "5"))
+
+
+_DIRS_READY = False
 
 
 def ensure_directories() -> None:
-    for directory in (DATA_DIR, TASKS_DIR, PRS_DIR, RUNS_DIR):
-        directory.mkdir(parents=True, exist_ok=True)
+    global _DIRS_READY
+    if _DIRS_READY:
+        return
+    # The leaf directories all live under DATA_DIR, so mkdir(parents=True) on
+    # each creates DATA_DIR too; skip the ones that already exist.
+    for directory in (TASKS_DIR, PRS_DIR, RUNS_DIR):
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
+    _DIRS_READY = True
@@ -1,9 +1,56 @@
 from __future__ import annotations
 from contextlib import contextmanager
+from pathlib import Path
+import orjson
+from sqlalchemy import event
 from sqlmodel import SQLModel, create_engine, Session
 from .config import DATABASE_URL
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {})
+_IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# WAL lets readers run alongside the webhook/scan writers, and NORMAL only
+# fsyncs at checkpoints, which is still durable across a clean shutdown.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _json_serializer(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# JSON columns (task lists, changed files, violations) go through orjson
+# rather than the stdlib encoder; the stored text stays plain JSON.
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if _IS_SQLITE else {},
+    pool_size=20,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+
+if _IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def database_exists() -> bool:
+    # Only a file-backed SQLite database can disappear from under us; assume
+    # server databases are provisioned out of band.
+    if _IS_SQLITE and engine.url.database not in (None, "", ":memory:"):
+        return Path(engine.url.database).exists()
+    return True
 
 
 def init_db() -> None:
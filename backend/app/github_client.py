@@ -1,14 +1,33 @@
 from __future__ import annotations
+import asyncio
 import base64
 import logging
-from typing import List, Optional
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .config import GITHUB_ACCESS_TOKEN
 
 logger = logging.getLogger(__name__)
 
 API_BASE = "https://api.github.com"
+FILES_PER_PAGE = 100
+MAX_PAGE_WORKERS = 5
+CONTENT_CACHE_SIZE = 2048
+RAW_CONTENT_ACCEPT = "application/vnd.github.raw"
+
+_LAST_PAGE_RE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+_COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+# (repo, path, ref) -> (etag, content), least recently used first.
+_CONTENT_CACHE: "OrderedDict[Tuple[str, str, str], Tuple[Optional[str], str]]" = OrderedDict()
+_CONTENT_CACHE_LOCK = threading.Lock()
+
 
 
 def _auth_headers() -> dict:
@@ -18,41 +37,119 @@ def _auth_headers() -> dict:
     return headers
 
 
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504], allowed_methods=["GET"])
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    session.headers.update(_auth_headers())
+    return session
+
+
+# Shared session so page/file requests reuse pooled keep-alive connections
+# and carry the auth headers without rebuilding them per call.
+_SESSION = _build_session()
+
+
+def _last_page(link_header: Optional[str]) -> int:
+    if not link_header:
+        return 1
+    match = _LAST_PAGE_RE.search(link_header)
+    return int(match.group(1)) if match else 1
+
+
+def _get_files_page(url: str, page: int) -> Optional[requests.Response]:
+    resp = _SESSION.get(
+        url,
+        params={"per_page": FILES_PER_PAGE, "page": page},
+        timeout=15,
+    )
+    if resp.status_code != 200:
+        logger.warning("GitHub API files request failed (%s) for page %d: %s", resp.status_code, page, resp.text)
+        return None
+    return resp
+
+
+def _page_filenames(resp: Optional[requests.Response]) -> List[str]:
+    if resp is None:
+        return []
+    return [item.get("filename") for item in resp.json() or [] if item.get("filename")]
+
+
 def fetch_pull_request_files(repo_full_name: str, pr_number: int) -> List[str]:
     if not repo_full_name:
         return []
-    params = {"per_page": 100, "page": 1}
-    filenames: List[str] = []
-    while True:
-        resp = requests.get(
-            f"{API_BASE}/repos/{repo_full_name}/pulls/{pr_number}/files",
-            headers=_auth_headers(),
-            params=params,
-            timeout=15,
-        )
-        if resp.status_code != 200:
-            logger.warning("GitHub API files request failed (%s): %s", resp.status_code, resp.text)
-            break
-        data = resp.json()
-        if not data:
-            break
-        filenames.extend(item.get("filename") for item in data if item.get("filename"))
-        if len(data) < params["per_page"]:
-            break
-        params["page"] += 1
+    url = f"{API_BASE}/repos/{repo_full_name}/pulls/{pr_number}/files"
+    first = _get_files_page(url, 1)
+    if first is None:
+        return []
+    filenames = _page_filenames(first)
+    last = _last_page(first.headers.get("Link"))
+    if last <= 1:
+        return filenames
+    # The first response tells us how many pages exist, so fetch the rest
+    # concurrently; map() keeps results in page order.
+    pages = range(2, last + 1)
+    with ThreadPoolExecutor(max_workers=min(MAX_PAGE_WORKERS, len(pages))) as executor:
+        for resp in executor.map(lambda page: _get_files_page(url, page), pages):
+            filenames.extend(_page_filenames(resp))
     return filenames
 
 
+async def fetch_pull_request_files_async(repo_full_name: str, pr_number: int) -> List[str]:
+    """Run fetch_pull_request_files off the event loop for async callers."""
+    return await asyncio.to_thread(fetch_pull_request_files, repo_full_name, pr_number)
+
+
+def _cached_content(key: Tuple[str, str, str]) -> Optional[Tuple[Optional[str], str]]:
+    with _CONTENT_CACHE_LOCK:
+        entry = _CONTENT_CACHE.get(key)
+        if entry is not None:
+            _CONTENT_CACHE.move_to_end(key)
+        return entry
+
+
+def _store_content(key: Tuple[str, str, str], etag: Optional[str], content: str) -> None:
+    with _CONTENT_CACHE_LOCK:
+        _CONTENT_CACHE[key] = (etag, content)
+        _CONTENT_CACHE.move_to_end(key)
+        while len(_CONTENT_CACHE) > CONTENT_CACHE_SIZE:
+            _CONTENT_CACHE.popitem(last=False)
+
+
+def _decode_json_content(resp: requests.Response, path: str) -> Optional[str]:
+    data = resp.json()
+    encoding = data.get("encoding")
+    content = data.get("content")
+    if encoding == "base64" and content:
+        try:
+            return base64.b64decode(content).decode("utf-8", errors="ignore")
+        except Exception as exc:
+            logger.warning("Unable to decode content for %s: %s", path, exc)
+            return None
+    logger.warning("Unexpected content encoding for %s: %s", path, encoding)
+    return None
+
+
 def fetch_file_content(repo_full_name: str, path: str, ref: Optional[str]) -> Optional[str]:
     if not repo_full_name or not path:
         return None
+    key = (repo_full_name, path, ref or "")
+    cached = _cached_content(key)
+    if cached is not None and ref and _COMMIT_SHA_RE.match(ref):
+        # Content at a commit SHA never changes, so skip the request entirely.
+        return cached[1]
+    url = f"{API_BASE}/repos/{repo_full_name}/contents/{path}"
     params = {"ref": ref} if ref else {}
-    resp = requests.get(
-        f"{API_BASE}/repos/{repo_full_name}/contents/{path}",
-        headers=_auth_headers(),
-        params=params,
-        timeout=15,
-    )
+    headers = {"Accept": RAW_CONTENT_ACCEPT}
+    if cached is not None and cached[0]:
+        headers["If-None-Match"] = cached[0]
+    resp = _SESSION.get(url, headers=headers, params=params, timeout=15)
+    if resp.status_code == 304 and cached is not None:
+        return cached[1]
+    raw = resp.status_code == 200
+    if resp.status_code in (406, 415):
+        # Raw media type not accepted; fall back to the base64 JSON payload.
+        resp = _SESSION.get(url, params=params, timeout=15)
     if resp.status_code != 200:
         logger.warning(
             "GitHub API content request failed (%s) for %s@%s: %s",
@@ -62,14 +159,7 @@ def fetch_file_content(repo_full_name: str, path: str, ref: Optional[str]) -> Op
             resp.text,
         )
         return None
-    data = resp.json()
-    encoding = data.get("encoding")
-    content = data.get("content")
-    if encoding == "base64" and content:
-        try:
-            return base64.b64decode(content).decode("utf-8", errors="ignore")
-        except Exception as exc:
-            logger.warning("Unable to decode content for %s: %s", path, exc)
-            return None
-    logger.warning("Unexpected content encoding for %s: %s", path, encoding)
-    return None
+    content = resp.content.decode("utf-8", errors="ignore") if raw else _decode_json_content(resp, path)
+    if content is not None:
+        _store_content(key, resp.headers.get("ETag"), content)
+    return content
@@ -1,18 +1,23 @@
 from __future__ import annotations
+import hmac
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import Depends, FastAPI, File, Header, HTTPException, Request, UploadFile, status
-from fastapi.responses import HTMLResponse
+from fastapi import BackgroundTasks, Depends, FastAPI, File, Header, HTTPException, UploadFile, status
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 import html
+import orjson
+from string import Template
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from .config import API_TOKEN, DATA_DIR, ensure_directories
-from .database import init_db
-from .security import verify_github_signature
-from .github_client import fetch_pull_request_files
+from .database import database_exists, init_db
+from .security import verified_webhook_body
+from .github_client import fetch_pull_request_files_async
 from .schemas import (
     TaskIngestRequest,
     TaskIngestResponse,
@@ -22,14 +27,35 @@ from .schemas import (
     PullRequestIngestRequest,
     AgentRunIngestRequest,
     AgentRunRecord,
+    TASK_ADAPTER,
 )
 from . import storage
-from .runner import enqueue_scan
+from .runner import enqueue_scan, start_pr_writer, stop_pr_writer, submit_pr_record
 
 logger = logging.getLogger(__name__)
 
-ensure_directories()
-init_db()
+SCHEMA_VERSION = 1
+SCHEMA_SENTINEL = DATA_DIR / f".schema_v{SCHEMA_VERSION}"
+
+
+def _init_once() -> None:
+    ensure_directories()
+    # create_all introspects every table; skip it once this data dir has been
+    # initialised at the current schema version and the database is present.
+    if SCHEMA_SENTINEL.exists() and database_exists():
+        return
+    init_db()
+    SCHEMA_SENTINEL.touch()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(_init_once)
+    start_pr_writer()
+    try:
+        yield
+    finally:
+        await stop_pr_writer()
 
 # RAG retriever singleton — initialized lazily on first document ingest
 _retriever = None
@@ -50,7 +76,7 @@ def get_retriever():
                 logger.warning("Failed to load persisted vector index, starting fresh")
     return _retriever
 
-app = FastAPI(title="Guardians API", version="0.1.0")
+app = FastAPI(title="Guardians API", version="0.1.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -59,13 +85,17 @@ app.add_middleware(
 )
 
 
+_BEARER_PREFIX = "Bearer "
+_API_TOKEN_BYTES = API_TOKEN.encode() if API_TOKEN else b""
+
+
 def require_token(authorization: Optional[str] = Header(default=None)) -> None:
     if not API_TOKEN:
         return
-    if not authorization or not authorization.startswith("Bearer "):
+    if not authorization or not authorization.startswith(_BEARER_PREFIX):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
-    token = authorization.split(" ", 1)[1]
-    if token != API_TOKEN:
+    token = authorization[len(_BEARER_PREFIX):].encode()
+    if not hmac.compare_digest(token, _API_TOKEN_BYTES):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
@@ -88,13 +118,20 @@ def ingest_tasks(payload: TaskIngestRequest, _: None = Depends(require_token)):
 
 @app.get("/tasks/current")
 def get_current_tasks():
-    latest = storage.load_latest_tasks_payload()
+    latest = storage.load_latest_tasks_raw()
     if not latest:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No task sets found")
-    return {
-        "metadata": latest["metadata"],
-        "tasks": latest["tasks"],
-    }
+    metadata, tasks_json = latest
+    # The tasks column already holds JSON text; splice it into the body
+    # instead of decoding the list only to encode it again.
+    body = b"".join((
+        b'{"metadata":',
+        metadata.model_dump_json(by_alias=True).encode(),
+        b',"tasks":',
+        tasks_json.encode() if tasks_json is not None else b"null",
+        b"}",
+    ))
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/pull-requests", response_model=PullRequestListResponse)
@@ -153,36 +190,17 @@ def get_agent_results(pr_id: str):
     return record
 
 
-@app.get("/debug/pull-requests", response_class=HTMLResponse)
-def debug_pull_requests():
-    prs = storage.load_pull_requests()
-    rows = []
-    for pr in prs:
-        rows.append(
-            f"<tr>"
-            f"<td>{html.escape(pr.id)}</td>"
-            f"<td>{html.escape(pr.repository)}</td>"
-            f"<td>{pr.number}</td>"
-            f"<td>{html.escape(pr.status)}</td>"
-            f"<td>{pr.files_changed}</td>"
-            f"<td>{pr.violations}</td>"
-            f"<td>{pr.lines_added}</td>"
-            f"<td>{pr.lines_removed}</td>"
-            f"<td>{html.escape(pr.last_run.isoformat() if pr.last_run else '—')}</td>"
-            f"</tr>"
-        )
-    rows_html = "\n".join(rows) or "<tr><td colspan='9'>No pull requests ingested yet.</td></tr>"
-    html_body = f"""
+_DEBUG_PAGE = Template("""
     <html>
       <head>
         <title>Guardians PR Debug</title>
         <style>
-          body {{ font-family: Arial, sans-serif; padding: 2rem; background: #0b1120; color: #e2e8f0; }}
-          table {{ border-collapse: collapse; width: 100%; }}
-          th, td {{ border: 1px solid #1e293b; padding: 0.5rem; text-align: left; }}
-          th {{ background: #1e293b; }}
-          tr:nth-child(even) {{ background: #111827; }}
-          a {{ color: #38bdf8; }}
+          body { font-family: Arial, sans-serif; padding: 2rem; background: #0b1120; color: #e2e8f0; }
+          table { border-collapse: collapse; width: 100%; }
+          th, td { border: 1px solid #1e293b; padding: 0.5rem; text-align: left; }
+          th { background: #1e293b; }
+          tr:nth-child(even) { background: #111827; }
+          a { color: #38bdf8; }
         </style>
       </head>
       <body>
@@ -202,35 +220,42 @@ def debug_pull_requests():
             </tr>
           </thead>
           <tbody>
-            {rows_html}
+            $rows
           </tbody>
         </table>
         <p>Data source: /pull-requests</p>
       </body>
     </html>
-    """
-    return HTMLResponse(content=html_body)
+    """)
+_DEBUG_ROW = "<tr>" + "<td>{}</td>" * 9 + "</tr>"
+_DEBUG_EMPTY_ROW = "<tr><td colspan='9'>No pull requests ingested yet.</td></tr>"
+
+
+def _debug_row(pr: PullRequestSummary) -> str:
+    fields = (
+        pr.id,
+        pr.repository,
+        pr.number,
+        pr.status,
+        pr.files_changed,
+        pr.violations,
+        pr.lines_added,
+        pr.lines_removed,
+        pr.last_run.isoformat() if pr.last_run else "—",
+    )
+    return _DEBUG_ROW.format(*map(html.escape, map(str, fields)))
 
-@app.post("/github/webhook", status_code=status.HTTP_202_ACCEPTED)
-async def github_webhook(
-    request: Request,
-    x_github_event: str = Header(alias="X-GitHub-Event"),
-    x_hub_signature_256: str | None = Header(default=None, alias="X-Hub-Signature-256"),
-):
-    raw_body = await request.body()
-    verify_github_signature(raw_body, x_hub_signature_256)
 
-    if x_github_event != "pull_request":
-        return {"status": "ignored", "reason": "unsupported event"}
-
-    payload = await request.json()
-    action = payload.get("action")
-    if action not in {"opened", "reopened", "synchronize"}:
-        return {"status": "ignored", "reason": f"action {action}"}
+@app.get("/debug/pull-requests", response_class=HTMLResponse)
+def debug_pull_requests():
+    prs = storage.load_pull_requests()
+    rows_html = "\n".join(_debug_row(pr) for pr in prs) or _DEBUG_EMPTY_ROW
+    return HTMLResponse(content=_DEBUG_PAGE.substitute(rows=rows_html))
 
+async def _process_pr_webhook(payload: dict) -> None:
     pr = payload.get("pull_request") or {}
     repo = payload.get("repository") or {}
-    changed_files = fetch_pull_request_files(repo.get("full_name", ""), pr.get("number"))
+    changed_files = await fetch_pull_request_files_async(repo.get("full_name", ""), pr.get("number"))
 
     pr_payload = PullRequestIngestRequest(
         repository=repo.get("full_name", ""),
@@ -245,8 +270,25 @@ async def github_webhook(
         lines_removed=pr.get("deletions", 0),
         changed_files=changed_files,
     )
-    summary = storage.upsert_scan_result(pr_payload.to_record())
-    enqueue_scan(summary.id)
+    await submit_pr_record(pr_payload.to_record())
+
+
+@app.post("/github/webhook", status_code=status.HTTP_202_ACCEPTED)
+async def github_webhook(
+    background: BackgroundTasks,
+    x_github_event: str = Header(alias="X-GitHub-Event"),
+    raw_body: bytes = Depends(verified_webhook_body),
+):
+    if x_github_event != "pull_request":
+        return {"status": "ignored", "reason": "unsupported event"}
+
+    payload = orjson.loads(raw_body)
+    action = payload.get("action")
+    if action not in {"opened", "reopened", "synchronize"}:
+        return {"status": "ignored", "reason": f"action {action}"}
+
+    # Fetching the file list and persisting the PR happen after the 202 is sent.
+    background.add_task(_process_pr_webhook, payload)
     return {"status": "accepted"}
 
 
@@ -313,22 +355,21 @@ async def ingest_documents(
 
     # Step 4: Save extracted tasks (with source chunk links) as a task set
     if all_extracted_tasks:
-        from .schemas import Task
         tasks = []
         for t in all_extracted_tasks:
             try:
-                tasks.append(Task(
-                    id=t.get("id", "unknown"),
-                    title=t.get("title", "Untitled"),
-                    description=t.get("description", ""),
-                    category=t.get("category", "General"),
-                    severity=t.get("severity", "warning"),
-                    checkType=t.get("checkType", "Pattern Detection"),
-                    fileTypes=t.get("fileTypes", ["*.py", "*.js"]),
-                    exampleViolation=t.get("exampleViolation", ""),
-                    suggestedFix=t.get("suggestedFix", ""),
-                    docReference=t.get("docReference", ""),
-                ))
+                tasks.append(TASK_ADAPTER.validate_python({
+                    "id": t.get("id", "unknown"),
+                    "title": t.get("title", "Untitled"),
+                    "description": t.get("description", ""),
+                    "category": t.get("category", "General"),
+                    "severity": t.get("severity", "warning"),
+                    "checkType": t.get("checkType", "Pattern Detection"),
+                    "fileTypes": t.get("fileTypes", ["*.py", "*.js"]),
+                    "exampleViolation": t.get("exampleViolation", ""),
+                    "suggestedFix": t.get("suggestedFix", ""),
+                    "docReference": t.get("docReference", ""),
+                }))
             except Exception:
                 continue
         if tasks:
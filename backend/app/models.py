@@ -1,14 +1,14 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON
 from sqlmodel import Field, SQLModel
 
 
 class TaskSet(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     task_set_id: str = Field(index=True, unique=True)
-    created_at: datetime
+    created_at: datetime = Field(index=True)
     task_count: int
     tasks: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
 
@@ -19,10 +19,12 @@ class Document(SQLModel, table=True):
     filename: str
     content: str
     chunk_count: int = Field(default=0)
-    created_at: datetime
+    created_at: datetime = Field(index=True)
 
 
 class ScanResult(SQLModel, table=True):
+    __table_args__ = (Index("ix_scanresult_repository_number", "repository", "number"),)
+
     pr_id: str = Field(primary_key=True)
     repository: str
     number: int
@@ -39,4 +41,4 @@ class ScanResult(SQLModel, table=True):
     summary: Optional[str] = None
     violations: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
     run_started_at: Optional[datetime] = None
-    run_completed_at: Optional[datetime] = None
+    run_completed_at: Optional[datetime] = Field(default=None, index=True)
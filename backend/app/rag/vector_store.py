@@ -15,6 +15,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -206,8 +207,8 @@ class VectorStore:
         """Persist index, metadata, and configuration to disk."""
         directory.mkdir(parents=True, exist_ok=True)
         faiss.write_index(self.index, str(directory / "index.faiss"))
-        with open(directory / "metadata.json", "w", encoding="utf-8") as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+        # Metadata carries every chunk's text, so write it compact with orjson.
+        (directory / "metadata.json").write_bytes(orjson.dumps(self.metadata))
         # Save config for proper reconstruction on load
         config = {
             "dimension": self.dimension,
@@ -228,8 +229,7 @@ class VectorStore:
 
         self.index = faiss.read_index(str(index_path))
         self.dimension = self.index.d
-        with open(meta_path, "r", encoding="utf-8") as f:
-            self.metadata = json.load(f)
+        self.metadata = orjson.loads(meta_path.read_bytes())
 
         # Load config if available
         config_path = directory / "config.json"
@@ -1,47 +1,121 @@
 from __future__ import annotations
 import asyncio
-import json
 import logging
 import sys
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from .github_client import fetch_file_content
 from . import storage
-from .schemas import AgentRunIngestRequest, AgentViolation
+from .schemas import AgentRunIngestRequest, AgentViolation, PullRequestRecord
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
 
 # Import validate_code functions for in-process RAG-enabled validation
-sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(REPO_ROOT))
 from validate_code import normalize_tasks_config, run_checks, Finding
 
 logger = logging.getLogger(__name__)
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-VALIDATOR_PATH = REPO_ROOT / "validate_code.py"
-_running: set[str] = set()
+FETCH_WORKERS = 8
+TASK_MAPS_CACHE_SIZE = 4
+_TASK_MAPS: "OrderedDict[str, Tuple[Dict[str, dict], Dict[str, dict]]]" = OrderedDict()
+_TASK_MAPS_LOCK = threading.Lock()
+MAX_CONCURRENT_SCANS = 4
+_SCAN_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+_inflight: Dict[str, asyncio.Task] = {}
 
 
-def enqueue_scan(pr_id: str) -> None:
+def enqueue_scan(pr_id: str) -> Optional[asyncio.Task]:
+    # Coalesce requests for a PR that is already queued or scanning.
+    existing = _inflight.get(pr_id)
+    if existing is not None and not existing.done():
+        return existing
     try:
         loop = asyncio.get_running_loop()
     except RuntimeError:
         logger.warning("No running event loop; cannot enqueue scan for %s", pr_id)
-        return
-    loop.create_task(_run_scan_task(pr_id))
+        return None
+    task = loop.create_task(_run_scan_task(pr_id))
+    _inflight[pr_id] = task
+    task.add_done_callback(lambda done: _inflight.pop(pr_id, None) if _inflight.get(pr_id) is done else None)
+    return task
 
 
 async def _run_scan_task(pr_id: str) -> None:
-    if pr_id in _running:
+    # Bound concurrent scans so a webhook burst cannot drain the default
+    # to_thread pool that the rest of the app shares.
+    async with _SCAN_SEMAPHORE:
+        try:
+            await asyncio.to_thread(_run_scan_sync, pr_id)
+        except Exception:  # pragma: no cover
+            logger.exception("Agent runner failed for %s", pr_id)
+
+
+PR_WRITE_BATCH = 50
+PR_WRITE_DEBOUNCE = 0.05
+_pr_queue: Optional[asyncio.Queue] = None
+_pr_writer: Optional[asyncio.Task] = None
+
+
+def start_pr_writer() -> None:
+    global _pr_queue, _pr_writer
+    _pr_queue = asyncio.Queue()
+    _pr_writer = asyncio.get_running_loop().create_task(_write_pr_records(_pr_queue))
+
+
+async def stop_pr_writer() -> None:
+    global _pr_queue, _pr_writer
+    if _pr_writer is None:
         return
-    _running.add(pr_id)
+    await _pr_queue.join()
+    _pr_writer.cancel()
     try:
-        await asyncio.to_thread(_run_scan_sync, pr_id)
-    except Exception:  # pragma: no cover
-        logger.exception("Agent runner failed for %s", pr_id)
-    finally:
-        _running.discard(pr_id)
+        await _pr_writer
+    except asyncio.CancelledError:
+        pass
+    _pr_queue = _pr_writer = None
+
+
+async def submit_pr_record(record: PullRequestRecord) -> None:
+    """Queue a webhook PR record for the batched writer, then scan it."""
+    if _pr_queue is None:
+        summary = await asyncio.to_thread(storage.upsert_scan_result, record)
+        enqueue_scan(summary.id)
+        return
+    _pr_queue.put_nowait(record)
+
+
+async def _write_pr_records(queue: asyncio.Queue) -> None:
+    # Collect records for up to PR_WRITE_DEBOUNCE after the first arrives so a
+    # burst of webhooks shares one transaction (and one SQLite fsync).
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + PR_WRITE_DEBOUNCE
+        while len(batch) < PR_WRITE_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            summaries = await asyncio.to_thread(storage.upsert_scan_results, batch)
+        except Exception:  # pragma: no cover
+            logger.exception("Failed to store %d PR record(s)", len(batch))
+        else:
+            for summary in summaries:
+                enqueue_scan(summary.id)
+        finally:
+            for _ in batch:
+                queue.task_done()
 
 
 def _run_scan_sync(pr_id: str) -> None:
@@ -64,38 +138,33 @@ def _run_scan_sync(pr_id: str) -> None:
         return
 
     ref = record.head_sha or record.head_branch
-    files_data = []
-    for path in changed_files:
-        content = fetch_file_content(record.repository, path, ref)
-        if content is None:
-            logger.warning("Unable to fetch %s for %s", path, pr_id)
-            continue
-        files_data.append((path, content))
-    if not files_data:
-        logger.warning("No file contents fetched for %s", pr_id)
-        return
-
-    # Get RAG retriever if documents have been ingested
-    retriever = None
-    try:
-        from .main import get_retriever
-        r = get_retriever()
-        if r.vector_store.size > 0:
-            retriever = r
-    except Exception:
-        pass
-
     with tempfile.TemporaryDirectory() as tmpdir:
         tmp_path = Path(tmpdir)
         temp_files: List[Path] = []
         path_map: Dict[str, str] = {}
-        for rel_path, content in files_data:
-            safe_rel = rel_path.lstrip("/\\")
-            dest = tmp_path / safe_rel
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_text(content, encoding="utf-8")
-            temp_files.append(dest)
-            path_map[str(dest)] = rel_path
+        # Each worker writes its file straight into the temp dir, so only one
+        # file's contents is held per worker at a time.
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            dests = executor.map(lambda path: _fetch_into(tmp_path, record.repository, path, ref), changed_files)
+            for rel_path, dest in zip(changed_files, dests):
+                if dest is None:
+                    logger.warning("Unable to fetch %s for %s", rel_path, pr_id)
+                    continue
+                temp_files.append(dest)
+                path_map[str(dest)] = rel_path
+        if not temp_files:
+            logger.warning("No file contents fetched for %s", pr_id)
+            return
+
+        # Get RAG retriever if documents have been ingested
+        retriever = None
+        try:
+            from .main import get_retriever
+            r = get_retriever()
+            if r.vector_store.size > 0:
+                retriever = r
+        except Exception:
+            pass
 
         start = datetime.now(timezone.utc)
         try:
@@ -106,15 +175,45 @@ def _run_scan_sync(pr_id: str) -> None:
             return
 
     passed = len(findings) == 0
-    violations = _build_violations_from_findings(findings, tasks, path_map)
+    violations = _build_violations_from_findings(findings, tasks_payload["metadata"].task_set_id, tasks, path_map)
     _save_runner_result(pr_id, violations, passed, len(tasks), start)
 
 
-def _build_violations_from_findings(findings: List[Finding], tasks: List[dict], path_map: Dict[str, str]) -> List[AgentViolation]:
+def _fetch_into(root: Path, repository: str, rel_path: str, ref: Optional[str]) -> Optional[Path]:
+    content = fetch_file_content(repository, rel_path, ref)
+    if content is None:
+        return None
+    dest = root / rel_path.lstrip("/\\")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    dest.write_text(content, encoding="utf-8")
+    return dest
+
+
+def _task_maps(task_set_id: str, tasks: List[dict]) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    # Task sets are immutable once stored, so the lookup maps can be shared
+    # across every scan that runs against the same set.
+    with _TASK_MAPS_LOCK:
+        maps = _TASK_MAPS.get(task_set_id)
+        if maps is not None:
+            _TASK_MAPS.move_to_end(task_set_id)
+            return maps
+    maps = (
+        {task.get("title") or task.get("name"): task for task in tasks},
+        {task.get("id"): task for task in tasks},
+    )
+    with _TASK_MAPS_LOCK:
+        _TASK_MAPS[task_set_id] = maps
+        while len(_TASK_MAPS) > TASK_MAPS_CACHE_SIZE:
+            _TASK_MAPS.popitem(last=False)
+    return maps
+
+
+def _build_violations_from_findings(
+    findings: List[Finding], task_set_id: str, tasks: List[dict], path_map: Dict[str, str]
+) -> List[AgentViolation]:
     if not findings:
         return []
-    title_map = {task.get("title") or task.get("name"): task for task in tasks}
-    id_map = {task.get("id"): task for task in tasks}
+    title_map, id_map = _task_maps(task_set_id, tasks)
     violations: List[AgentViolation] = []
     for finding in findings:
         task_info = title_map.get(finding.task) or id_map.get(finding.task)
@@ -134,32 +233,6 @@ def _build_violations_from_findings(findings: List[Finding], tasks: List[dict],
     return violations
 
 
-def _build_violations(findings: List[dict], tasks: List[dict], path_map: Dict[str, str]) -> List[AgentViolation]:
-    if not findings:
-        return []
-    title_map = {task.get("title") or task.get("name"): task for task in tasks}
-    id_map = {task.get("id"): task for task in tasks}
-    violations: List[AgentViolation] = []
-    for finding in findings:
-        task_name = finding.get("task")
-        task_info = title_map.get(task_name) or id_map.get(task_name)
-        severity = (task_info or {}).get("severity", "warning")
-        task_id = (task_info or {}).get("id", task_name or "task")
-        temp_path = finding.get("file")
-        rel_path = path_map.get(temp_path, temp_path)
-        violations.append(
-            AgentViolation(
-                taskId=task_id,
-                message=finding.get("message", "Task violation detected."),
-                file=rel_path,
-                line=int(finding.get("line", 1)),
-                severity=severity,
-                suggestedFix=finding.get("fix"),
-            )
-        )
-    return violations
-
-
 def _save_runner_result(pr_id: str, violations: List[AgentViolation], passed: bool, task_count: int, start_time: Optional[datetime] = None) -> None:
     status = "passed" if passed else ("critical" if any(v.severity == "critical" for v in violations) else "warnings")
     start = start_time or datetime.now(timezone.utc)
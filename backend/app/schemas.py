@@ -2,17 +2,20 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import uuid4
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from pydantic.alias_generators import to_camel
 
 
 class SourceFile(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     size: int = Field(ge=0)
     mime: Optional[str] = None
 
 
 class Task(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(populate_by_name=True, frozen=True, from_attributes=True)
 
     id: str
     title: str
@@ -26,20 +29,22 @@ class Task(BaseModel):
     doc_reference: str = Field(alias="docReference")
 
     def as_payload(self) -> dict:
-        return self.model_dump(by_alias=True)
+        return TASK_ADAPTER.dump_python(self, by_alias=True)
 
 
 class TaskIngestRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     tasks: List[Task]
     source_files: Optional[List[SourceFile]] = Field(default=None, alias="sourceFiles")
 
 
 class TaskMetadata(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, frozen=True, from_attributes=True)
 
-    task_set_id: str = Field(alias="taskSetId")
-    created_at: datetime = Field(alias="createdAt")
-    task_count: int = Field(alias="taskCount")
+    task_set_id: str
+    created_at: datetime
+    task_count: int
     path: str
 
 
@@ -48,7 +53,7 @@ class TaskIngestResponse(TaskMetadata):
 
 
 class PullRequestSummary(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, frozen=True, from_attributes=True)
 
     id: str
     number: int
@@ -56,24 +61,24 @@ class PullRequestSummary(BaseModel):
     repository: str
     author: str
     status: str
-    files_changed: int = Field(alias="filesChanged")
+    files_changed: int
     violations: int
-    lines_added: int = Field(alias="linesAdded")
-    lines_removed: int = Field(alias="linesRemoved")
-    last_run: Optional[datetime] = Field(default=None, alias="lastRun")
+    lines_added: int
+    lines_removed: int
+    last_run: Optional[datetime] = None
     summary: Optional[str] = None
     result: List[dict] = Field(default_factory=list)
 
 
 class PullRequestRecord(PullRequestSummary):
-    base_branch: str = Field(alias="baseBranch")
-    head_branch: str = Field(alias="headBranch")
-    head_sha: Optional[str] = Field(default=None, alias="headSha")
-    changed_files: List[str] = Field(default_factory=list, alias="changedFiles")
+    base_branch: str
+    head_branch: str
+    head_sha: Optional[str] = None
+    changed_files: List[str] = Field(default_factory=list)
 
 
 class PullRequestIngestRequest(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(populate_by_name=True, frozen=True, from_attributes=True)
 
     repository: str = Field(alias="repo")
     number: int = Field(alias="pr_number")
@@ -91,8 +96,9 @@ class PullRequestIngestRequest(BaseModel):
     pr_id: Optional[str] = Field(default=None, alias="id")
 
     def to_record(self) -> PullRequestRecord:
+        # Every field was validated on the way in, so skip re-validation.
         pr_id = self.pr_id or f"{self.repository}#PR-{self.number}"
-        return PullRequestRecord(
+        return PullRequestRecord.model_construct(
             id=pr_id,
             number=self.number,
             title=self.title,
@@ -111,6 +117,8 @@ class PullRequestIngestRequest(BaseModel):
 
 
 class PullRequestListResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     items: List[PullRequestSummary]
 
 
@@ -119,6 +127,8 @@ class PullRequestDetail(PullRequestRecord):
 
 
 class AgentViolation(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     task_id: str = Field(alias="taskId")
     message: str
     file: str
@@ -128,20 +138,22 @@ class AgentViolation(BaseModel):
 
 
 class AgentRunRecord(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, frozen=True, from_attributes=True)
 
-    run_id: str = Field(alias="runId")
-    pull_request_id: str = Field(alias="pullRequestId")
+    run_id: str
+    pull_request_id: str
     status: str
-    started_at: datetime = Field(alias="startedAt")
-    completed_at: Optional[datetime] = Field(default=None, alias="completedAt")
-    task_count: int = Field(default=0, alias="taskCount")
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    task_count: int = 0
     source: str = "github_action"
     notes: Optional[str] = None
     violations: List[AgentViolation] = Field(default_factory=list)
 
 
 class AgentRunIngestRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     run_id: Optional[str] = Field(default=None, alias="runId")
     pull_request_id: str = Field(alias="pullRequestId")
     status: str
@@ -153,8 +165,9 @@ class AgentRunIngestRequest(BaseModel):
     violations: List[AgentViolation] = Field(default_factory=list)
 
     def to_record(self) -> AgentRunRecord:
+        # Every field was validated on the way in, so skip re-validation.
         now = datetime.now(timezone.utc)
-        return AgentRunRecord(
+        return AgentRunRecord.model_construct(
             run_id=self.run_id or f"run-{uuid4()}",
             pull_request_id=self.pull_request_id,
             status=self.status,
@@ -165,3 +178,10 @@ class AgentRunIngestRequest(BaseModel):
             notes=self.notes,
             violations=self.violations,
         )
+
+
+# Shared adapters so hot paths validate and dump through one prebuilt
+# pydantic-core validator/serializer instead of going model by model.
+TASK_ADAPTER = TypeAdapter(Task)
+TASK_LIST_ADAPTER = TypeAdapter(List[Task])
+VIOLATION_LIST_ADAPTER = TypeAdapter(List[AgentViolation])
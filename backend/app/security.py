@@ -1,16 +1,59 @@
 import hmac
 import hashlib
-from typing import Optional
-from fastapi import HTTPException, status
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from fastapi import Header, HTTPException, Request, status
 from .config import GITHUB_WEBHOOK_SECRET
 
+_DIGEST_SIZE = hashlib.sha256().digest_size
 
-def verify_github_signature(payload: bytes, signature: Optional[str]) -> None:
-    if not GITHUB_WEBHOOK_SECRET:
-        return
+
+@lru_cache(maxsize=256)
+def _get_hmac_proto(secret: bytes) -> hmac.HMAC:
+    # Derive the keyed HMAC state once per secret; callers copy() it per
+    # request instead of re-keying on every webhook.
+    return hmac.new(secret, digestmod=hashlib.sha256)
+
+
+def _signature_digest(signature: Optional[str]) -> bytes:
     if not signature or not signature.startswith("sha256="):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing signature")
-    sig = signature.split("=", 1)[1]
-    digest = hmac.new(GITHUB_WEBHOOK_SECRET.encode(), payload, hashlib.sha256).hexdigest()
-    if not hmac.compare_digest(sig, digest):
+    try:
+        digest = bytes.fromhex(signature[len("sha256="):])
+    except ValueError:
+        digest = b""
+    # Reject malformed lengths up front so compare_digest only ever sees two
+    # full SHA-256 digests.
+    if len(digest) != _DIGEST_SIZE:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+    return digest
+
+
+async def verify_github_signature(chunks: AsyncIterator[bytes], signature: Optional[str]) -> bytes:
+    """Read a webhook body, feeding each chunk into the HMAC as it arrives.
+
+    Returns the joined body once the signature checks out, so callers never
+    hold a second buffered copy of the payload.
+    """
+    mac = expected = None
+    if GITHUB_WEBHOOK_SECRET:
+        # Decode the header before touching the body so malformed signatures
+        # are rejected without reading or hashing the payload.
+        expected = _signature_digest(signature)
+        mac = _get_hmac_proto(GITHUB_WEBHOOK_SECRET.encode()).copy()
+    parts = []
+    async for chunk in chunks:
+        if mac is not None:
+            mac.update(chunk)
+        parts.append(chunk)
+    if mac is not None and not hmac.compare_digest(expected, mac.digest()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+    return b"".join(parts)
+
+
+async def verified_webhook_body(
+    request: Request,
+    x_hub_signature_256: Optional[str] = Header(default=None, alias="X-Hub-Signature-256"),
+) -> bytes:
+    """FastAPI dependency yielding the webhook body once its signature is verified."""
+    return await verify_github_signature(request.stream(), x_hub_signature_256)
@@ -1,8 +1,15 @@
 from __future__ import annotations
+import threading
+import time
 from datetime import datetime, timezone
-from typing import List, Optional
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import String, cast, update
 from sqlmodel import select
 
+from .config import STORAGE_CACHE_TTL
 from .database import get_session
 from .models import TaskSet, ScanResult, Document
 from .schemas import (
@@ -13,22 +20,66 @@ from .schemas import (
     PullRequestRecord,
     AgentRunRecord,
     AgentViolation,
+    TASK_LIST_ADAPTER,
+    VIOLATION_LIST_ADAPTER,
 )
 
 
+# Read-through cache for the per-request loaders. Writers in this module
+# invalidate the keys they touch; the TTL bounds staleness when another
+# worker process does the write.
+_LATEST_TASKS_KEY = ("tasks", "latest")
+_LATEST_TASKS_RAW_KEY = ("tasks", "latest-raw")
+_MISSING = object()
+_CACHE: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_CACHE_GENERATIONS: Dict[Tuple[str, str], int] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: Tuple[str, str]) -> Tuple[Any, int]:
+    """Return (cached value or _MISSING, generation to pass to _cache_set)."""
+    with _CACHE_LOCK:
+        generation = _CACHE_GENERATIONS.get(key, 0)
+        entry = _CACHE.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return _MISSING, generation
+    return entry[1], generation
+
+
+def _cache_set(key: Tuple[str, str], generation: int, value: Any) -> None:
+    if STORAGE_CACHE_TTL <= 0:
+        return
+    with _CACHE_LOCK:
+        # Skip the store if a writer invalidated the key while we were loading.
+        if _CACHE_GENERATIONS.get(key, 0) == generation:
+            _CACHE[key] = (time.monotonic() + STORAGE_CACHE_TTL, value)
+
+
+def _cache_invalidate(*keys: Tuple[str, str]) -> None:
+    with _CACHE_LOCK:
+        for key in keys:
+            _CACHE.pop(key, None)
+            _CACHE_GENERATIONS[key] = _CACHE_GENERATIONS.get(key, 0) + 1
+
+
+def _task_set_stamp(now: datetime) -> str:
+    # Compact UTC stamp with no ':' so ids stay path/URL safe without a replace pass.
+    return now.strftime("%Y%m%dT%H%M%S%fZ")
+
+
 def save_task_set(tasks: List[Task]) -> TaskMetadata:
     now = datetime.now(timezone.utc)
-    task_set_id = f"taskset-{now.isoformat().replace(':', '-')}"
-    payload = [task.as_payload() for task in tasks]
+    task_set_id = f"taskset-{_task_set_stamp(now)}"
+    payload = TASK_LIST_ADAPTER.dump_python(tasks, by_alias=True)
     with get_session() as session:
         entry = TaskSet(task_set_id=task_set_id, created_at=now, task_count=len(payload), tasks=payload)
         session.add(entry)
         session.commit()
-        session.refresh(entry)
+    _cache_invalidate(_LATEST_TASKS_KEY, _LATEST_TASKS_RAW_KEY)
     return TaskMetadata(
         task_set_id=task_set_id,
-        created_at=entry.created_at,
-        task_count=entry.task_count,
+        created_at=now,
+        task_count=len(payload),
         path=f"taskset://{task_set_id}",
     )
 
@@ -40,154 +91,240 @@ def save_task_set_raw(tasks: List[dict]) -> None:
     without needing a separate RAG query.
     """
     now = datetime.now(timezone.utc)
-    task_set_id = f"taskset-raw-{now.isoformat().replace(':', '-')}"
+    task_set_id = f"taskset-raw-{_task_set_stamp(now)}"
     with get_session() as session:
         entry = TaskSet(task_set_id=task_set_id, created_at=now, task_count=len(tasks), tasks=tasks)
         session.add(entry)
         session.commit()
+    _cache_invalidate(_LATEST_TASKS_KEY, _LATEST_TASKS_RAW_KEY)
 
 
 def load_latest_tasks_payload() -> Optional[dict]:
+    cached, generation = _cache_get(_LATEST_TASKS_KEY)
+    if cached is not _MISSING:
+        return cached
     with get_session() as session:
         statement = select(TaskSet).order_by(TaskSet.created_at.desc()).limit(1)
         result = session.exec(statement).first()
         if not result:
-            return None
+            payload = None
+        else:
+            metadata = TaskMetadata(
+                task_set_id=result.task_set_id,
+                created_at=result.created_at,
+                task_count=result.task_count,
+                path=f"taskset://{result.task_set_id}",
+            )
+            payload = {"metadata": metadata, "tasks": result.tasks}
+    _cache_set(_LATEST_TASKS_KEY, generation, payload)
+    return payload
+
+
+def load_latest_tasks_raw() -> Optional[Tuple[TaskMetadata, Optional[str]]]:
+    """Like load_latest_tasks_payload, but with the tasks left as stored JSON text.
+
+    Casting the column to a string skips the JSON decode, for callers that
+    only pass the list straight back out as JSON.
+    """
+    cached, generation = _cache_get(_LATEST_TASKS_RAW_KEY)
+    if cached is not _MISSING:
+        return cached
+    with get_session() as session:
+        statement = (
+            select(TaskSet.task_set_id, TaskSet.created_at, TaskSet.task_count, cast(TaskSet.tasks, String))
+            .order_by(TaskSet.created_at.desc())
+            .limit(1)
+        )
+        row = session.exec(statement).first()
+    if not row:
+        result = None
+    else:
+        task_set_id, created_at, task_count, tasks_json = row
         metadata = TaskMetadata(
-            task_set_id=result.task_set_id,
-            created_at=result.created_at,
-            task_count=result.task_count,
-            path=f"taskset://{result.task_set_id}",
+            task_set_id=task_set_id,
+            created_at=created_at,
+            task_count=task_count,
+            path=f"taskset://{task_set_id}",
         )
-        return {"metadata": metadata, "tasks": result.tasks}
+        result = (metadata, tasks_json)
+    _cache_set(_LATEST_TASKS_RAW_KEY, generation, result)
+    return result
+
+
+LIST_YIELD_PER = 1000
+_SUMMARY_COLUMNS = (
+    ScanResult.pr_id,
+    ScanResult.number,
+    ScanResult.title,
+    ScanResult.repository,
+    ScanResult.author,
+    ScanResult.status,
+    ScanResult.files_changed,
+    ScanResult.violations,
+    ScanResult.lines_added,
+    ScanResult.lines_removed,
+    ScanResult.run_completed_at,
+    ScanResult.summary,
+)
+# Row attribute -> schema field pairs, read off a row in one attrgetter call.
+_SUMMARY_FIELDS = ("id", "number", "title", "repository", "author", "status", "files_changed",
+                   "lines_added", "lines_removed", "last_run", "summary")
+_SUMMARY_GET = attrgetter("pr_id", "number", "title", "repository", "author", "status", "files_changed",
+                          "lines_added", "lines_removed", "run_completed_at", "summary")
+_DETAIL_FIELDS = ("base_branch", "head_branch", "head_sha", "changed_files")
+_DETAIL_GET = attrgetter(*_DETAIL_FIELDS)
+
+
+def _summary_fields(row: Any) -> Dict[str, Any]:
+    fields = dict(zip(_SUMMARY_FIELDS, _SUMMARY_GET(row)))
+    violations = row.violations or []
+    fields["violations"] = len(violations)
+    fields["result"] = violations
+    return fields
+
+
+def _summary_from_row(row: Any) -> PullRequestSummary:
+    # Rows were validated when written; build the summary without running
+    # pydantic validation again.
+    return PullRequestSummary.model_construct(**_summary_fields(row))
 
 
 def load_pull_requests() -> List[PullRequestSummary]:
     with get_session() as session:
-        rows = session.exec(select(ScanResult).order_by(ScanResult.run_completed_at.desc().nulls_last())).all()
-        return [
-            PullRequestSummary(
-                id=row.pr_id,
-                number=row.number,
-                title=row.title,
-                repository=row.repository,
-                author=row.author,
-                status=row.status,
-                files_changed=row.files_changed,
-                violations=len(row.violations or []),
-                lines_added=row.lines_added,
-                lines_removed=row.lines_removed,
-                last_run=row.run_completed_at,
-                summary=row.summary,
-                result=row.violations or [],
-            )
-            for row in rows
-        ]
+        # Select only the summary columns so rows come back as plain tuples
+        # (no ORM identity map), streamed in chunks for large PR lists.
+        statement = (
+            select(*_SUMMARY_COLUMNS)
+            .order_by(ScanResult.run_completed_at.desc().nulls_last())
+            .execution_options(yield_per=LIST_YIELD_PER)
+        )
+        return [_summary_from_row(row) for row in session.exec(statement)]
 
 
 def load_pull_request_record(pr_id: str) -> Optional[PullRequestDetail]:
+    key = ("pr", pr_id)
+    cached, generation = _cache_get(key)
+    if cached is not _MISSING:
+        return cached
+    record = _load_pull_request_record(pr_id)
+    _cache_set(key, generation, record)
+    return record
+
+
+def _load_pull_request_record(pr_id: str) -> Optional[PullRequestDetail]:
     with get_session() as session:
         row = session.get(ScanResult, pr_id)
         if not row:
             return None
-        return PullRequestDetail(
-            id=row.pr_id,
-            number=row.number,
-            title=row.title,
-            repository=row.repository,
-            author=row.author,
-            status=row.status,
-            files_changed=row.files_changed,
-            violations=len(row.violations or []),
-            lines_added=row.lines_added,
-            lines_removed=row.lines_removed,
-            base_branch=row.base_branch,
-            head_branch=row.head_branch,
-            head_sha=row.head_sha,
-            changed_files=row.changed_files,
-            last_run=row.run_completed_at,
-            result=row.violations or [],
-            summary=row.summary,
+        return PullRequestDetail.model_construct(
+            **_summary_fields(row), **dict(zip(_DETAIL_FIELDS, _DETAIL_GET(row)))
         )
 
 
+_PR_METADATA_FIELDS = (
+    "repository",
+    "number",
+    "title",
+    "author",
+    "base_branch",
+    "head_branch",
+    "head_sha",
+    "files_changed",
+    "lines_added",
+    "lines_removed",
+    "changed_files",
+)
+_PLACEHOLDER_PR = {
+    "repository": "",
+    "number": 0,
+    "title": "",
+    "author": "",
+    "base_branch": "",
+    "head_branch": "",
+    "files_changed": 0,
+    "lines_added": 0,
+    "lines_removed": 0,
+    "changed_files": [],
+}
+
+
+def _dialect_insert(session):
+    # ON CONFLICT upserts are dialect-specific; SQLite and Postgres share the API.
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert
+    if dialect == "postgresql":
+        return postgresql_insert
+    raise RuntimeError(f"Upserts are not supported on {dialect!r} databases")
+
+
 def upsert_scan_result(record: PullRequestRecord) -> PullRequestSummary:
+    return upsert_scan_results([record])[0]
+
+
+def upsert_scan_results(records: List[PullRequestRecord]) -> List[PullRequestSummary]:
+    """Upsert a batch of PR records with one INSERT ... ON CONFLICT statement.
+
+    If the batch holds several records for the same PR, the last one wins.
+    Run state (status, violations, timestamps) on existing rows is kept.
+    """
+    latest = {record.id: record for record in records}
+    values = [
+        {
+            "pr_id": record.id,
+            **{field: getattr(record, field) for field in _PR_METADATA_FIELDS},
+            "status": "pending",
+            "violations": [],
+        }
+        for record in latest.values()
+    ]
     with get_session() as session:
-        row = session.get(ScanResult, record.id)
-        if not row:
-            row = ScanResult(
-                pr_id=record.id,
-                repository=record.repository,
-                number=record.number,
-                title=record.title,
-                author=record.author,
-                base_branch=record.base_branch,
-                head_branch=record.head_branch,
-                head_sha=record.head_sha,
-                files_changed=record.files_changed,
-                lines_added=record.lines_added,
-                lines_removed=record.lines_removed,
-                changed_files=record.changed_files,
-                status="pending",
-            )
-            session.add(row)
-        else:
-            row.repository = record.repository
-            row.number = record.number
-            row.title = record.title
-            row.author = record.author
-            row.base_branch = record.base_branch
-            row.head_branch = record.head_branch
-            row.head_sha = record.head_sha
-            row.files_changed = record.files_changed
-            row.lines_added = record.lines_added
-            row.lines_removed = record.lines_removed
-            row.changed_files = record.changed_files
+        statement = _dialect_insert(session)(ScanResult).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ScanResult.pr_id],
+            set_={field: statement.excluded[field] for field in _PR_METADATA_FIELDS},
+        ).returning(*_SUMMARY_COLUMNS)
+        returned = {row.pr_id: row for row in session.exec(statement)}
         session.commit()
-        session.refresh(row)
-        return PullRequestSummary(
-            id=row.pr_id,
-            number=row.number,
-            title=row.title,
-            repository=row.repository,
-            author=row.author,
-            status=row.status,
-            files_changed=row.files_changed,
-            violations=len(row.violations or []),
-            lines_added=row.lines_added,
-            lines_removed=row.lines_removed,
-            last_run=row.run_completed_at,
-            summary=row.summary,
-            result=row.violations or [],
-        )
+    _cache_invalidate(*(("pr", pr_id) for pr_id in latest))
+    return [_summary_from_row(returned[pr_id]) for pr_id in latest]
 
 
 def save_scan_result(record: AgentRunRecord) -> None:
+    violations = [
+        violation if isinstance(violation, AgentViolation) else AgentViolation.model_construct(**violation)
+        for violation in record.violations
+    ]
+    run_state = {
+        "status": _map_run_status(record.status),
+        "summary": record.notes,
+        "run_started_at": record.started_at,
+        "run_completed_at": record.completed_at or record.started_at,
+        "violations": VIOLATION_LIST_ADAPTER.dump_python(violations, by_alias=True),
+    }
     with get_session() as session:
-        row = session.get(ScanResult, record.pull_request_id)
-        if not row:
-            row = ScanResult(
-                pr_id=record.pull_request_id,
-                repository="",
-                number=0,
-                title="",
-                author="",
-                base_branch="",
-                head_branch="",
-            )
-            session.add(row)
-        row.status = _map_run_status(record.status)
-        row.summary = record.notes
-        row.run_started_at = record.started_at
-        row.run_completed_at = record.completed_at or record.started_at
-        row.violations = [
-            violation.model_dump(by_alias=True) if isinstance(violation, AgentViolation) else violation
-            for violation in record.violations
-        ]
+        # Runs can arrive for PRs we have not seen yet; insert a placeholder
+        # row in that case, otherwise only the run columns are updated.
+        statement = _dialect_insert(session)(ScanResult).values(
+            pr_id=record.pull_request_id, **_PLACEHOLDER_PR, **run_state
+        )
+        statement = statement.on_conflict_do_update(index_elements=[ScanResult.pr_id], set_=run_state)
+        session.exec(statement)
         session.commit()
+    _cache_invalidate(("pr", record.pull_request_id), ("run", record.pull_request_id))
 
 
 def load_scan_result(pr_id: str) -> Optional[AgentRunRecord]:
+    key = ("run", pr_id)
+    cached, generation = _cache_get(key)
+    if cached is not _MISSING:
+        return cached
+    record = _load_scan_result(pr_id)
+    _cache_set(key, generation, record)
+    return record
+
+
+def _load_scan_result(pr_id: str) -> Optional[AgentRunRecord]:
     with get_session() as session:
         row = session.get(ScanResult, pr_id)
         if not row or not row.run_started_at:
@@ -206,17 +343,24 @@ def load_scan_result(pr_id: str) -> Optional[AgentRunRecord]:
 
 
 def mark_scan_pending(pr_id: str) -> bool:
+    statement = (
+        update(ScanResult)
+        .where(ScanResult.pr_id == pr_id)
+        .values(
+            status="pending",
+            summary="Awaiting agent run",
+            run_started_at=None,
+            run_completed_at=None,
+            violations=[],
+        )
+    )
     with get_session() as session:
-        row = session.get(ScanResult, pr_id)
-        if not row:
-            return False
-        row.status = "pending"
-        row.summary = "Awaiting agent run"
-        row.run_started_at = None
-        row.run_completed_at = None
-        row.violations = []
+        updated = session.exec(statement).rowcount
         session.commit()
-        return True
+    if not updated:
+        return False
+    _cache_invalidate(("pr", pr_id), ("run", pr_id))
+    return True
 
 
 def list_scan_ids() -> List[str]:
@@ -253,11 +397,14 @@ def load_documents() -> List[dict]:
         ]
 
 
+_RUN_STATUS_MAP = {
+    "passed": "ready",
+    "warnings": "violations",
+    "critical": "critical",
+    "error": "critical",
+}
+
+
 def _map_run_status(status: str) -> str:
-    if status == "passed":
-        return "ready"
-    if status == "warnings":
-        return "violations"
-    if status in {"critical", "error"}:
-        return "critical"
-    return status or "pending"
+    # Unknown statuses pass through unchanged; empty ones become "pending".
+    return _RUN_STATUS_MAP.get(status, status or "pending")
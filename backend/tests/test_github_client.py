@@ -0,0 +1,118 @@
+"""Tests for the GitHub API client helpers."""
+import base64
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import github_client
+from app.github_client import _last_page, fetch_file_content, fetch_pull_request_files
+
+
+def _page_response(filenames, link=None, status_code=200):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = [{"filename": name} for name in filenames]
+    resp.headers = {"Link": link} if link else {}
+    resp.text = ""
+    return resp
+
+
+class TestLastPage:
+    def test_no_header(self):
+        assert _last_page(None) == 1
+
+    def test_parses_last_rel(self):
+        link = (
+            '<https://api.github.com/repositories/1/pulls/2/files?per_page=100&page=2>; rel="next", '
+            '<https://api.github.com/repositories/1/pulls/2/files?per_page=100&page=7>; rel="last"'
+        )
+        assert _last_page(link) == 7
+
+    def test_header_without_last(self):
+        link = '<https://api.github.com/x?page=1>; rel="prev"'
+        assert _last_page(link) == 1
+
+
+class TestFetchPullRequestFiles:
+    def test_empty_repo_name(self):
+        assert fetch_pull_request_files("", 1) == []
+
+    def test_single_page(self):
+        with patch.object(github_client._SESSION, "get", return_value=_page_response(["a.py", "b.py"])) as get:
+            assert fetch_pull_request_files("org/repo", 3) == ["a.py", "b.py"]
+        assert get.call_count == 1
+
+    def test_remaining_pages_fetched_in_order(self):
+        link = '<https://api.github.com/x?per_page=100&page=3>; rel="last"'
+        pages = {
+            1: _page_response(["p1.py"], link=link),
+            2: _page_response(["p2.py"]),
+            3: _page_response(["p3.py"]),
+        }
+
+        def fake_get(url, params=None, timeout=None):
+            return pages[params["page"]]
+
+        with patch.object(github_client._SESSION, "get", side_effect=fake_get):
+            assert fetch_pull_request_files("org/repo", 3) == ["p1.py", "p2.py", "p3.py"]
+
+    def test_failed_first_page(self):
+        with patch.object(github_client._SESSION, "get", return_value=_page_response([], status_code=404)):
+            assert fetch_pull_request_files("org/repo", 3) == []
+
+
+def _content_response(text, status_code=200, etag=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.content = text.encode()
+    resp.headers = {"ETag": etag} if etag else {}
+    resp.text = text
+    return resp
+
+
+def _json_content_response(text):
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.json.return_value = {"encoding": "base64", "content": base64.b64encode(text.encode()).decode()}
+    resp.headers = {}
+    return resp
+
+
+class TestFetchFileContent:
+    def setup_method(self):
+        github_client._CONTENT_CACHE.clear()
+
+    def test_raw_content(self):
+        with patch.object(github_client._SESSION, "get", return_value=_content_response("print(1)")) as get:
+            assert fetch_file_content("org/repo", "a.py", "main") == "print(1)"
+        assert get.call_args.kwargs["headers"]["Accept"] == github_client.RAW_CONTENT_ACCEPT
+
+    def test_falls_back_to_base64_json(self):
+        unsupported = _content_response("", status_code=415)
+        with patch.object(github_client._SESSION, "get", side_effect=[unsupported, _json_content_response("print(2)")]):
+            assert fetch_file_content("org/repo", "a.py", "main") == "print(2)"
+
+    def test_sha_ref_served_from_cache(self):
+        sha = "a" * 40
+        with patch.object(github_client._SESSION, "get", return_value=_content_response("x = 1")) as get:
+            assert fetch_file_content("org/repo", "a.py", sha) == "x = 1"
+            assert fetch_file_content("org/repo", "a.py", sha) == "x = 1"
+        assert get.call_count == 1
+
+    def test_branch_ref_revalidates_with_etag(self):
+        first = _content_response("x = 1", etag='"v1"')
+        not_modified = _content_response("", status_code=304)
+        with patch.object(github_client._SESSION, "get", side_effect=[first, not_modified]) as get:
+            assert fetch_file_content("org/repo", "a.py", "main") == "x = 1"
+            assert fetch_file_content("org/repo", "a.py", "main") == "x = 1"
+        assert get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    def test_failure_not_cached(self):
+        failed = _content_response("", status_code=404)
+        ok = _content_response("y = 2")
+        sha = "b" * 40
+        with patch.object(github_client._SESSION, "get", side_effect=[failed, ok]):
+            assert fetch_file_content("org/repo", "b.py", sha) is None
+            assert fetch_file_content("org/repo", "b.py", sha) == "y = 2"
@@ -0,0 +1,105 @@
+"""Tests for the background scan runner's scheduling."""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import runner
+
+
+class TestEnqueueScan:
+    def test_without_running_loop(self):
+        assert runner.enqueue_scan("org/repo#PR-1") is None
+
+    def test_coalesces_inflight_pr(self):
+        calls = []
+
+        def fake_scan(pr_id):
+            calls.append(pr_id)
+            time.sleep(0.05)
+
+        async def scenario():
+            first = runner.enqueue_scan("org/repo#PR-1")
+            second = runner.enqueue_scan("org/repo#PR-1")
+            assert first is second
+            await first
+            assert "org/repo#PR-1" not in runner._inflight
+
+        with patch.object(runner, "_run_scan_sync", side_effect=fake_scan):
+            asyncio.run(scenario())
+        assert calls == ["org/repo#PR-1"]
+
+    def test_bounds_concurrent_scans(self):
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def fake_scan(pr_id):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+        async def scenario():
+            tasks = [runner.enqueue_scan(f"org/repo#PR-{n}") for n in range(runner.MAX_CONCURRENT_SCANS * 2)]
+            await asyncio.gather(*tasks)
+
+        with patch.object(runner, "_SCAN_SEMAPHORE", asyncio.Semaphore(runner.MAX_CONCURRENT_SCANS)), \
+                patch.object(runner, "_run_scan_sync", side_effect=fake_scan):
+            asyncio.run(scenario())
+        assert peak[0] == runner.MAX_CONCURRENT_SCANS
+
+
+class TestPrWriter:
+    def test_burst_is_written_in_one_batch(self):
+        batches = []
+
+        def fake_upsert(records):
+            batches.append([record.id for record in records])
+            return [MagicMock(id=record.id) for record in records]
+
+        async def scenario():
+            runner.start_pr_writer()
+            for n in range(3):
+                await runner.submit_pr_record(MagicMock(id=f"org/repo#PR-{n}"))
+            await runner.stop_pr_writer()
+
+        with patch.object(runner.storage, "upsert_scan_results", side_effect=fake_upsert), \
+                patch.object(runner, "enqueue_scan") as enqueue:
+            asyncio.run(scenario())
+        assert batches == [["org/repo#PR-0", "org/repo#PR-1", "org/repo#PR-2"]]
+        assert [call.args[0] for call in enqueue.call_args_list] == batches[0]
+        assert runner._pr_queue is None
+
+    def test_writes_directly_without_writer(self):
+        async def scenario():
+            await runner.submit_pr_record(MagicMock(id="org/repo#PR-9"))
+
+        with patch.object(runner.storage, "upsert_scan_result", return_value=MagicMock(id="org/repo#PR-9")) as upsert, \
+                patch.object(runner, "enqueue_scan") as enqueue:
+            asyncio.run(scenario())
+        assert upsert.call_count == 1
+        enqueue.assert_called_once_with("org/repo#PR-9")
+
+
+class TestTaskMaps:
+    def setup_method(self):
+        runner._TASK_MAPS.clear()
+
+    def test_maps_reused_for_same_task_set(self):
+        tasks = [{"id": "t1", "title": "No eval"}]
+        first = runner._task_maps("taskset-1", tasks)
+        assert runner._task_maps("taskset-1", []) is first
+        assert first == ({"No eval": tasks[0]}, {"t1": tasks[0]})
+
+    def test_oldest_task_set_evicted(self):
+        for n in range(runner.TASK_MAPS_CACHE_SIZE + 1):
+            runner._task_maps(f"taskset-{n}", [])
+        assert "taskset-0" not in runner._TASK_MAPS
+        assert len(runner._TASK_MAPS) == runner.TASK_MAPS_CACHE_SIZE
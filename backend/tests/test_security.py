@@ -0,0 +1,88 @@
+"""Tests for GitHub webhook signature verification."""
+import asyncio
+import hashlib
+import hmac
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import security
+from app.security import verify_github_signature
+
+SECRET = "webhook-secret"
+BODY_CHUNKS = [b'{"action": ', b'"opened"}']
+
+
+async def _stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _with_secret(secret):
+    return patch.object(security, "GITHUB_WEBHOOK_SECRET", secret)
+
+
+def _verify(signature, chunks=BODY_CHUNKS):
+    return asyncio.run(verify_github_signature(_stream(chunks), signature))
+
+
+class TestVerifyGithubSignature:
+    def test_valid_signature_returns_body(self):
+        with _with_secret(SECRET):
+            assert _verify(_sign(b"".join(BODY_CHUNKS))) == b"".join(BODY_CHUNKS)
+
+    def test_invalid_signature(self):
+        with _with_secret(SECRET):
+            with pytest.raises(HTTPException) as exc:
+                _verify(_sign(b"".join(BODY_CHUNKS), secret="other"))
+        assert exc.value.detail == "Invalid signature"
+
+    @pytest.mark.parametrize("signature", [None, "", "sha1=abc"])
+    def test_missing_signature(self, signature):
+        with _with_secret(SECRET):
+            with pytest.raises(HTTPException) as exc:
+                _verify(signature)
+        assert exc.value.detail == "Missing signature"
+
+    @pytest.mark.parametrize("signature", ["sha256=zz", "sha256=abcd", "sha256=" + "0" * 66])
+    def test_malformed_digest(self, signature):
+        with _with_secret(SECRET):
+            with pytest.raises(HTTPException) as exc:
+                _verify(signature)
+        assert exc.value.detail == "Invalid signature"
+
+    @pytest.mark.parametrize("signature", [None, "sha256=zz", "sha256=abcd"])
+    def test_malformed_signature_rejected_before_reading_body(self, signature):
+        consumed = []
+
+        async def tracking_stream():
+            consumed.append(True)
+            yield b"{}"
+
+        with _with_secret(SECRET):
+            with pytest.raises(HTTPException):
+                asyncio.run(verify_github_signature(tracking_stream(), signature))
+        assert consumed == []
+
+    def test_no_secret_skips_verification(self):
+        with _with_secret(None):
+            assert _verify(None) == b"".join(BODY_CHUNKS)
+
+    def test_prototype_not_consumed(self):
+        with _with_secret(SECRET):
+            expected = b"".join(BODY_CHUNKS)
+            assert _verify(_sign(expected)) == expected
+            assert _verify(_sign(expected)) == expected
+
+    def test_prototype_cached_per_secret(self):
+        assert security._get_hmac_proto(b"a") is security._get_hmac_proto(b"a")
+        assert security._get_hmac_proto(b"a") is not security._get_hmac_proto(b"b")
@@ -0,0 +1,184 @@
+"""Tests for storage upserts and the read-through cache helpers."""
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import orjson
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import models, storage  # noqa: F401
+from app.schemas import AgentRunRecord, PullRequestRecord, Task
+
+KEY = ("pr", "org/repo#PR-1")
+
+
+class TestReadCache:
+    def setup_method(self):
+        storage._CACHE.clear()
+        storage._CACHE_GENERATIONS.clear()
+
+    def test_miss_then_hit(self):
+        value, generation = storage._cache_get(KEY)
+        assert value is storage._MISSING
+        storage._cache_set(KEY, generation, "record")
+        assert storage._cache_get(KEY)[0] == "record"
+
+    def test_none_is_cached(self):
+        _, generation = storage._cache_get(KEY)
+        storage._cache_set(KEY, generation, None)
+        assert storage._cache_get(KEY)[0] is None
+
+    def test_invalidate_drops_entry(self):
+        _, generation = storage._cache_get(KEY)
+        storage._cache_set(KEY, generation, "record")
+        storage._cache_invalidate(KEY)
+        assert storage._cache_get(KEY)[0] is storage._MISSING
+
+    def test_stale_load_not_stored_after_invalidation(self):
+        _, generation = storage._cache_get(KEY)
+        storage._cache_invalidate(KEY)
+        storage._cache_set(KEY, generation, "stale")
+        assert storage._cache_get(KEY)[0] is storage._MISSING
+
+    def test_expired_entry_is_a_miss(self):
+        _, generation = storage._cache_get(KEY)
+        storage._cache_set(KEY, generation, "record")
+        with patch.object(storage.time, "monotonic", return_value=storage.time.monotonic() + storage.STORAGE_CACHE_TTL + 1):
+            assert storage._cache_get(KEY)[0] is storage._MISSING
+
+    def test_disabled_with_zero_ttl(self):
+        with patch.object(storage, "STORAGE_CACHE_TTL", 0):
+            storage._cache_set(KEY, 0, "record")
+        assert storage._cache_get(KEY)[0] is storage._MISSING
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    storage._CACHE.clear()
+    with patch.object(storage, "get_session", get_session):
+        yield
+    storage._CACHE.clear()
+    engine.dispose()
+
+
+def _record(number, title="Add feature", **overrides):
+    fields = dict(
+        id=f"org/repo#PR-{number}",
+        number=number,
+        title=title,
+        repository="org/repo",
+        author="dev",
+        status="pending",
+        files_changed=1,
+        violations=0,
+        lines_added=10,
+        lines_removed=2,
+        base_branch="main",
+        head_branch="feature",
+        head_sha="abc",
+        changed_files=["app.py"],
+    )
+    fields.update(overrides)
+    return PullRequestRecord(**fields)
+
+
+def _run(pr_id, status="warnings"):
+    return AgentRunRecord(
+        run_id="run-1",
+        pull_request_id=pr_id,
+        status=status,
+        started_at=datetime(2024, 1, 1, 12, 0),
+        violations=[{"taskId": "t1", "message": "m", "file": "app.py", "line": 3, "severity": "warning"}],
+    )
+
+
+class TestUpsertScanResults:
+    def test_insert_returns_pending_summaries_in_order(self, db):
+        summaries = storage.upsert_scan_results([_record(2), _record(1)])
+        assert [s.id for s in summaries] == ["org/repo#PR-2", "org/repo#PR-1"]
+        assert all(s.status == "pending" and s.result == [] for s in summaries)
+
+    def test_last_record_for_a_pr_wins(self, db):
+        summaries = storage.upsert_scan_results([_record(1, title="old"), _record(1, title="new")])
+        assert [s.title for s in summaries] == ["new"]
+
+    def test_update_keeps_run_state(self, db):
+        storage.upsert_scan_result(_record(1))
+        storage.save_scan_result(_run("org/repo#PR-1"))
+        summary = storage.upsert_scan_result(_record(1, title="Renamed", changed_files=["b.py"]))
+        assert summary.title == "Renamed"
+        assert summary.status == "violations"
+        assert summary.violations == 1
+        detail = storage.load_pull_request_record("org/repo#PR-1")
+        assert detail.changed_files == ["b.py"]
+
+
+class TestSaveScanResult:
+    def test_creates_placeholder_for_unknown_pr(self, db):
+        storage.save_scan_result(_run("org/repo#PR-7", status="passed"))
+        detail = storage.load_pull_request_record("org/repo#PR-7")
+        assert detail.status == "ready"
+        assert detail.repository == ""
+        assert detail.changed_files == []
+
+    def test_updates_run_columns_only(self, db):
+        storage.upsert_scan_result(_record(1))
+        storage.save_scan_result(_run("org/repo#PR-1", status="critical"))
+        run = storage.load_scan_result("org/repo#PR-1")
+        assert run.status == "critical"
+        assert run.violations[0].task_id == "t1"
+        assert storage.load_pull_request_record("org/repo#PR-1").title == "Add feature"
+
+
+class TestMarkScanPending:
+    def test_unknown_pr(self, db):
+        assert storage.mark_scan_pending("org/repo#PR-404") is False
+
+    def test_resets_run_state(self, db):
+        storage.upsert_scan_result(_record(1))
+        storage.save_scan_result(_run("org/repo#PR-1"))
+        assert storage.load_scan_result("org/repo#PR-1") is not None
+        assert storage.mark_scan_pending("org/repo#PR-1") is True
+        assert storage.load_scan_result("org/repo#PR-1") is None
+        detail = storage.load_pull_request_record("org/repo#PR-1")
+        assert detail.status == "pending"
+        assert detail.violations == 0
+        assert detail.title == "Add feature"
+
+
+class TestSaveTaskSet:
+    def test_id_and_metadata_share_one_timestamp(self, db):
+        task = Task(
+            id="t1", title="No eval", description="d", category="security", severity="critical",
+            checkType="pattern", fileTypes=["*.py"], exampleViolation="eval(x)",
+            suggestedFix="ast.literal_eval", docReference="policy.md",
+        )
+        metadata = storage.save_task_set([task])
+        assert metadata.task_set_id == f"taskset-{metadata.created_at.strftime('%Y%m%dT%H%M%S%fZ')}"
+        assert ":" not in metadata.task_set_id
+        assert metadata.task_count == 1
+        assert storage.load_latest_tasks_payload()["metadata"].task_set_id == metadata.task_set_id
+
+
+class TestLatestTasksRaw:
+    def test_returns_stored_json_text(self, db):
+        assert storage.load_latest_tasks_raw() is None
+        tasks = [{"id": "t1", "title": "No eval", "fileTypes": ["*.py"]}]
+        storage.save_task_set_raw(tasks)
+        metadata, tasks_json = storage.load_latest_tasks_raw()
+        assert metadata.task_count == 1
+        assert orjson.loads(tasks_json) == tasks
+        assert storage.load_latest_tasks_payload()["tasks"] == tasks
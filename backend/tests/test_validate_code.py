@@ -1,6 +1,13 @@
 """Tests for validate_code.py core functions."""
+import fnmatch
+import glob
+import hashlib
 import sys
+import textwrap
 import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import patch
 
@@ -17,6 +24,7 @@ from validate_code import (
     _convert_guardian_task,
     Finding,
 )
+import validate_code
 
 
 class TestTruncateCode:
@@ -46,6 +54,57 @@ class TestTruncateCode:
         assert result == code
 
 
+class _WordEncoding:
+    """Stand-in tokenizer: each whitespace-separated word is one token."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class TestTruncateCodeTokens:
+    def _token_budget(self, budget):
+        return patch.multiple(validate_code, MAX_CODE_TOKENS=budget, _token_encoding=lambda model: _WordEncoding())
+
+    def test_truncates_by_tokens(self):
+        code = " ".join(f"w{n}" for n in range(20))
+        with self._token_budget(4):
+            result, truncated = _truncate_code(code)
+        assert truncated is True
+        assert result == "w0 w1\n...\nw18 w19"
+
+    def test_fits_budget_unchanged(self):
+        code = "a " * 300
+        with self._token_budget(400):
+            assert _truncate_code(code) == (code, False)
+
+    def test_explicit_limit_stays_in_characters(self):
+        with self._token_budget(1):
+            result, truncated = _truncate_code("x" * 200, limit=100)
+        assert truncated is True
+        assert len(result) == 105
+
+    def test_char_fallback_without_tiktoken(self):
+        with patch.multiple(validate_code, MAX_CODE_TOKENS=4, MAX_CODE_CHARS=10, tiktoken=None):
+            validate_code._token_encoding.cache_clear()
+            result, truncated = _truncate_code("y" * 50)
+        validate_code._token_encoding.cache_clear()
+        assert truncated is True
+        assert result == "yyyyy\n...\nyyyyy"
+
+    def test_env_setting(self, monkeypatch):
+        monkeypatch.setenv("VALIDATOR_MAX_CODE_TOKENS", "1500")
+        validate_code.refresh_openai_settings()
+        assert validate_code.MAX_CODE_TOKENS == 1500
+        monkeypatch.setenv("VALIDATOR_MAX_CODE_TOKENS", "lots")
+        validate_code.refresh_openai_settings()
+        assert validate_code.MAX_CODE_TOKENS is None
+        monkeypatch.delenv("VALIDATOR_MAX_CODE_TOKENS")
+        validate_code.refresh_openai_settings()
+
+
 class TestBuildAIMessages:
     def test_basic_message_structure(self):
         payloads = [{"internalRef": 0, "name": "test", "description": "desc"}]
@@ -56,6 +115,13 @@ class TestBuildAIMessages:
         assert "test.py" in messages[1]["content"]
         assert "print('hi')" in messages[1]["content"]
 
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_tasks_json_is_compact(self, use_orjson):
+        payloads = [{"internalRef": 0, "name": "Naïve check", "description": "desc"}]
+        with patch.object(validate_code, "orjson", validate_code.orjson if use_orjson else None):
+            content = _build_ai_messages(payloads, "test.py", "code")[1]["content"]
+        assert '[{"internalRef":0,"name":"Naïve check","description":"desc"}]' in content
+
     def test_rag_context_included(self):
         payloads = [{"internalRef": 0, "name": "test", "description": "desc"}]
         rag_context = [
@@ -135,6 +201,13 @@ class TestRuleAppliesToFile:
         assert _rule_applies_to_file(rule, "test.py") is True
         assert _rule_applies_to_file(rule, "test.js") is False
 
+    def test_matches_like_fnmatch(self):
+        globs = ["*.py", "src/**/*.ts", "Makefile", "[ab]?.js"]
+        rule = {"file_globs": globs}
+        for path in ["x.py", "src/a/b.ts", "Makefile", "ab.js", "a.js", "c1.js", "dir/x.py", "x.pyc"]:
+            expected = any(fnmatch.fnmatch(path, pat) for pat in globs)
+            assert _rule_applies_to_file(rule, path) is expected
+
     def test_no_globs_matches_all(self):
         rule = {"file_globs": None}
         assert _rule_applies_to_file(rule, "test.py") is True
@@ -142,6 +215,21 @@ class TestRuleAppliesToFile:
         assert _rule_applies_to_file(rule2, "test.py") is True
 
 
+class TestRuleBuckets:
+    def test_rules_sharing_globs_share_a_bucket(self):
+        rules = [
+            {"file_globs": ["*.py", "*.js"]},
+            {"file_globs": None},
+            {"file_globs": ["*.py", "*.js"]},
+            {"file_globs": ["*.ts"]},
+            {},
+        ]
+        buckets = validate_code._rule_buckets(rules)
+        assert [idxs for _, idxs in buckets] == [[0, 2], [1, 4], [3]]
+        assert buckets[1][0] is None
+        assert buckets[0][0].match("app.js") and not buckets[0][0].match("app.ts")
+
+
 class TestNormalizeTasksConfig:
     def test_dict_format(self):
         cfg = {"rules": [{"id": "t1"}]}
@@ -188,3 +276,419 @@ class TestFinding:
         assert d["file"] == "a.py"
         assert d["line"] == 10
         assert d["fix"] == "good"
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10")
+    def test_uses_slots(self):
+        f = Finding(task="test", file="a.py", line=1, column=0, message="bad")
+        assert not hasattr(f, "__dict__")
+        assert f.fix is None
+
+
+class TestJSONReport:
+    PAYLOAD = {"ALL_TASKS_MET": False, "findings": [Finding(task="t", file="é.py", line=1, column=2, message="m")]}
+    EXPECTED = {"ALL_TASKS_MET": False, "findings": [
+        {"task": "t", "file": "é.py", "line": 1, "column": 2, "message": "m", "fix": None},
+    ]}
+
+    def test_orjson_path(self):
+        if validate_code.orjson is None:
+            pytest.skip("orjson not installed")
+        assert json.loads(validate_code._json_report_bytes(self.PAYLOAD)) == self.EXPECTED
+
+    def test_stdlib_fallback(self):
+        with patch.object(validate_code, "orjson", None):
+            data = validate_code._json_report_bytes(self.PAYLOAD)
+        assert b"\n  " in data
+        assert json.loads(data) == self.EXPECTED
+
+
+class TestFormatHuman:
+    def test_fix_is_indented_like_textwrap(self):
+        fix = "  use a parameter\n\nquery(sql, [user_id])\n"
+        f = Finding(task="sql", file="a.py", line=3, column=1, message="raw SQL", fix=fix)
+        report = validate_code.format_human([f], {"total_rules": 1, "passed_rules": 0})
+        expected_tail = "- [sql] a.py:3:1 — raw SQL\n" + textwrap.indent("Fix:\n" + fix.strip(), "    ")
+        assert report.endswith(expected_tail)
+
+    def test_no_findings(self):
+        report = validate_code.format_human([], {"total_rules": 2, "passed_rules": 2, "passed_rule_names": ["a", "b"]})
+        assert report.splitlines() == ["✅ ALL_TASKS_MET: True", "Tasks Passed: 2/2", "Passed Task Names: a, b"]
+
+
+class TestExpandFileArgs:
+    def test_globs_deduplicated_in_order(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        for name in ("b.py", "a.py", "notes.txt"):
+            (tmp_path / name).write_text("", encoding="utf-8")
+        (tmp_path / "pkg").mkdir()
+        files = validate_code.expand_file_args(["b.py", "*.py", "pkg", "missing.py", "b.py"])
+        assert files[0] == Path("b.py")
+        assert sorted(map(str, files)) == ["a.py", "b.py"]
+
+
+    def test_equivalent_spellings_collapse(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.py").write_text("", encoding="utf-8")
+        files = validate_code.expand_file_args(["./src/a.py", "src/a.py", "src//a.py", "src/*"])
+        assert files == [Path("src/a.py")]
+
+    def test_directory_globs_match_glob_module(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        for rel in ("src/a.py", "src/.hidden.py", "src/pkg/b.py", "src/pkg/deep/c.ts", "src/.git/config", "top.py"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("", encoding="utf-8")
+        for token in ("src/**", "src/*", "src/pkg/**", "src/**/*.py", "*.py"):
+            expected = [Path(c) for c in glob.glob(token, recursive=True) if Path(c).is_file()]
+            assert validate_code.expand_file_args([token]) == expected, token
+        assert validate_code._scan_root("src/**") == ("src", True)
+        assert validate_code._scan_root("s*/**") is None
+
+
+class TestRunChecks:
+    RULES = {"rules": [{"id": "t1", "name": "No eval", "file_globs": ["*.py"]}]}
+
+    def _write_files(self, tmp_path, count):
+        paths = []
+        for n in range(count):
+            path = tmp_path / f"mod{n}.py"
+            path.write_text(f"value = {n}\n", encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def test_findings_keep_file_order_under_concurrency(self, tmp_path):
+        def fake_eval(payloads, file_rel, code, rag_context=None):
+            # Later files finish first, so ordering comes from the runner.
+            time.sleep(0.01 * (5 - int(file_rel[3])))
+            return [{"internalRef": 0, "compliant": False, "explanation": file_rel}]
+
+        paths = self._write_files(tmp_path, 5)
+        with patch.object(validate_code, "evaluate_tasks_with_ai", side_effect=fake_eval):
+            findings, summary = validate_code.run_checks(self.RULES, paths, tmp_path, concurrency=5)
+        assert [f.file for f in findings] == [f"mod{n}.py" for n in range(5)]
+        assert [f.message for f in findings] == [f"mod{n}.py" for n in range(5)]
+        assert summary["passed_rules"] == 0
+
+    def test_global_include_and_exclude(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        paths = [tmp_path / "src" / "a.py", tmp_path / "src" / "a_test.py", tmp_path / "b.py"]
+        for path in paths:
+            path.write_text("x = 1\n", encoding="utf-8")
+        cfg = dict(self.RULES, include=["src/*"], exclude=["*_test.py"])
+        with patch.object(validate_code, "evaluate_tasks_with_ai", return_value=[]) as ai:
+            validate_code.run_checks(cfg, paths, tmp_path)
+        assert [call.args[1] for call in ai.call_args_list] == ["src/a.py"]
+
+    def test_reads_only_files_with_applicable_rules(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+        (tmp_path / "b.js").write_text("let x = 1;\n", encoding="utf-8")
+        with patch.object(validate_code, "read_source", wraps=validate_code.read_source) as reader, \
+                patch.object(validate_code, "evaluate_tasks_with_ai", return_value=[]) as ai:
+            validate_code.run_checks(self.RULES, [tmp_path / "a.py", tmp_path / "b.js"], tmp_path)
+        assert [call.args[0].name for call in reader.call_args_list] == ["a.py"]
+        assert ai.call_args.args[2] == "x = 1\n"
+
+    def test_read_source_digest_matches_encoded_text(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("s = 'h\u00e9llo'\n", encoding="utf-8")
+        code, digest = validate_code.read_source(path)
+        assert code == "s = 'h\u00e9llo'\n"
+        assert digest == hashlib.sha256(code.encode("utf-8")).hexdigest()
+        path.write_bytes(b"\xff\xfe")
+        assert validate_code.read_source(path) == ("", hashlib.sha256(b"").hexdigest())
+
+    def test_identical_files_share_one_request(self, tmp_path):
+        for name in ("a.py", "b.py", "c.py"):
+            (tmp_path / name).write_text("x = 1\n" if name != "c.py" else "y = 2\n", encoding="utf-8")
+        paths = [tmp_path / name for name in ("a.py", "b.py", "c.py")]
+        result = [{"internalRef": 0, "compliant": False, "violations": [{"message": "dup", "line": 1}]}]
+        with patch.object(validate_code, "evaluate_tasks_with_ai", return_value=result) as ai:
+            findings, _ = validate_code.run_checks(self.RULES, paths, tmp_path)
+        assert [call.args[1] for call in ai.call_args_list] == ["a.py", "c.py"]
+        assert [f.file for f in findings] == ["a.py", "b.py", "c.py"]
+
+    def test_failed_file_does_not_abort_others(self, tmp_path):
+        def fake_eval(payloads, file_rel, code, rag_context=None):
+            if file_rel == "mod0.py":
+                raise RuntimeError("boom")
+            return [{"internalRef": 0, "compliant": True}]
+
+        paths = self._write_files(tmp_path, 2)
+        with patch.object(validate_code, "evaluate_tasks_with_ai", side_effect=fake_eval):
+            findings, _ = validate_code.run_checks(self.RULES, paths, tmp_path, concurrency=2)
+        assert len(findings) == 1
+        assert findings[0].file == "mod0.py"
+        assert findings[0].message == "AI evaluation failed: boom"
+
+
+class TestBatchEvaluate:
+    def _fake_api(self, outputs, status="completed"):
+        calls = []
+
+        def fake_request(url, api_key, data=None, content_type="application/json", timeout=90):
+            calls.append(url)
+            if url.endswith("/files"):
+                assert b'name="purpose"\r\n\r\nbatch' in data
+                return b'{"id": "file-in"}'
+            if url.endswith("/batches"):
+                assert json.loads(data)["input_file_id"] == "file-in"
+                return b'{"id": "batch-1", "status": "validating"}'
+            if url.endswith("/batches/batch-1"):
+                return json.dumps({"id": "batch-1", "status": status, "output_file_id": "file-out"}).encode()
+            if url.endswith("/files/file-out/content"):
+                return "\n".join(json.dumps(line) for line in outputs).encode()
+            raise AssertionError(url)
+
+        return fake_request, calls
+
+    def _output(self, custom_id, tasks):
+        content = json.dumps({"tasks": tasks})
+        return {
+            "custom_id": custom_id,
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+            "error": None,
+        }
+
+    def test_results_mapped_by_custom_id(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        fake, calls = self._fake_api([
+            self._output("b.py#1", [{"internalRef": 0, "compliant": True}]),
+            {"custom_id": "a.py#0", "response": {"status_code": 500, "body": {"error": "boom"}}, "error": None},
+        ])
+        with patch.object(validate_code, "_openai_request", side_effect=fake):
+            results = validate_code.batch_evaluate(
+                [("a.py#0", [{"role": "user", "content": "a"}]), ("b.py#1", [{"role": "user", "content": "b"}]),
+                 ("c.py#2", [{"role": "user", "content": "c"}])],
+                model="gpt-test",
+            )
+        assert results["b.py#1"] == ([{"internalRef": 0, "compliant": True}], None)
+        assert "500" in str(results["a.py#0"][1])
+        assert results["c.py#2"][0] is None
+        assert calls[0] == "https://api.openai.com/v1/files"
+
+    def test_failed_batch_raises(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        fake, _ = self._fake_api([], status="failed")
+        with patch.object(validate_code, "_openai_request", side_effect=fake):
+            with pytest.raises(RuntimeError, match="status failed"):
+                validate_code.batch_evaluate([("a.py#0", [])], model="gpt-test")
+
+    def test_run_checks_routes_through_batch(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+
+        def fake_batch(requests):
+            assert [custom_id for custom_id, _ in requests] == ["a.py#0"]
+            return {"a.py#0": ([{"internalRef": 0, "compliant": False, "explanation": "bad"}], None)}
+
+        with patch.object(validate_code, "batch_evaluate", side_effect=fake_batch), \
+                patch.object(validate_code, "evaluate_tasks_with_ai") as direct:
+            findings, _ = validate_code.run_checks(TestRunChecks.RULES, [tmp_path / "a.py"], tmp_path, batch=True)
+        direct.assert_not_called()
+        assert [(f.file, f.message) for f in findings] == [("a.py", "bad")]
+
+
+class TestMultiFileRequests:
+    def test_messages_carry_tasks_once_and_every_file(self):
+        payloads = [{"internalRef": 0, "name": "No eval"}]
+        messages = validate_code._build_ai_messages_multi(payloads, [("a.py", "A = 1"), ("b.py", "B = 2")])
+        content = messages[1]["content"]
+        assert messages[0]["content"] == validate_code.AI_MULTI_FILE_SYSTEM_PROMPT
+        assert content.count("Tasks JSON:") == 1
+        files_json = json.loads(content.split("Files JSON:\n", 1)[1].rsplit("\nReturn JSON", 1)[0])
+        assert [(f["fileRef"], f["path"], f["code"]) for f in files_json] == [(0, "a.py", "A = 1"), (1, "b.py", "B = 2")]
+
+    def test_group_jobs_by_rule_fingerprint(self):
+        py = [(0, {}, {}), (1, {}, {})]
+        js = [(1, {}, {})]
+        jobs = [("a.py", "", py, None), ("b.js", "", js, None), ("c.py", "", py, None), ("d.py", "", py, None)]
+        assert validate_code._group_jobs(jobs, 1) == [[0], [1], [2], [3]]
+        assert validate_code._group_jobs(jobs, 2) == [[0, 2], [1], [3]]
+
+    def test_run_checks_splits_results_by_file_ref(self, tmp_path):
+        paths = []
+        for name in ("a.py", "b.py", "c.py"):
+            (tmp_path / name).write_text(f"name = {name!r}\n", encoding="utf-8")
+            paths.append(tmp_path / name)
+        calls = []
+
+        def fake_eval(payloads, files, rag_context=None):
+            calls.append([file_rel for file_rel, _ in files])
+            return [
+                {"fileRef": 1, "internalRef": 0, "compliant": False, "explanation": "bad b"},
+                {"fileRef": 0, "internalRef": 0, "compliant": True},
+            ]
+
+        with patch.object(validate_code, "evaluate_files_with_ai", side_effect=fake_eval), \
+                patch.object(validate_code, "evaluate_tasks_with_ai", return_value=[{"internalRef": 0, "compliant": True}]):
+            findings, _ = validate_code.run_checks(TestRunChecks.RULES, paths, tmp_path, files_per_request=2)
+        assert calls == [["a.py", "b.py"]]
+        assert [(f.file, f.message) for f in findings] == [("b.py", "bad b")]
+
+
+class TestResultCache:
+    RULES = {"rules": [
+        {"id": "t1", "name": "No eval", "file_globs": ["*.py"]},
+        {"id": "t2", "name": "Docstrings", "file_globs": ["*.py"]},
+    ]}
+
+    def _fake_eval(self, calls):
+        def fake_eval(payloads, file_rel, code, rag_context=None):
+            calls.append([p["internalRef"] for p in payloads])
+            return [{"internalRef": p["internalRef"], "compliant": p["internalRef"] == 0, "explanation": "no docs"} for p in payloads]
+        return fake_eval
+
+    def test_unchanged_file_skips_ai(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+        cache_dir = tmp_path / ".validate_cache"
+        calls = []
+        with patch.object(validate_code, "evaluate_tasks_with_ai", side_effect=self._fake_eval(calls)):
+            first, _ = validate_code.run_checks(self.RULES, [tmp_path / "a.py"], tmp_path, cache_dir=cache_dir)
+            second, summary = validate_code.run_checks(self.RULES, [tmp_path / "a.py"], tmp_path, cache_dir=cache_dir)
+        assert calls == [[0, 1]]
+        assert [f.as_dict() for f in second] == [f.as_dict() for f in first]
+        assert summary["passed_rule_names"] == ["No eval"]
+        assert (cache_dir / "cache.json").is_file()
+
+    def test_changed_code_or_rule_misses(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n", encoding="utf-8")
+        cache_dir = tmp_path / "cache"
+        calls = []
+        with patch.object(validate_code, "evaluate_tasks_with_ai", side_effect=self._fake_eval(calls)):
+            validate_code.run_checks(self.RULES, [path], tmp_path, cache_dir=cache_dir)
+            path.write_text("x = 2\n", encoding="utf-8")
+            validate_code.run_checks(self.RULES, [path], tmp_path, cache_dir=cache_dir)
+            rules = {"rules": [self.RULES["rules"][0], dict(self.RULES["rules"][1], description="changed")]}
+            validate_code.run_checks(rules, [path], tmp_path, cache_dir=cache_dir)
+        assert calls == [[0, 1], [0, 1], [1]]
+
+    def test_failures_are_not_cached(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+        cache_dir = tmp_path / "cache"
+        with patch.object(validate_code, "evaluate_tasks_with_ai", side_effect=RuntimeError("boom")) as ai:
+            validate_code.run_checks(self.RULES, [tmp_path / "a.py"], tmp_path, cache_dir=cache_dir)
+            validate_code.run_checks(self.RULES, [tmp_path / "a.py"], tmp_path, cache_dir=cache_dir)
+        assert ai.call_count == 2
+        assert not (cache_dir / "cache.json").exists()
+
+    def test_corrupt_cache_file_ignored(self, tmp_path):
+        (tmp_path / "cache.json").write_text("{not json", encoding="utf-8")
+        cache = validate_code.ResultCache(tmp_path)
+        assert cache.entries == {}
+        cache.put("k", {"internalRef": 3, "compliant": True})
+        cache.save()
+        assert validate_code.ResultCache(tmp_path).get("k") == {"compliant": True}
+
+
+class TestOpenAIRetry:
+    def _errors(self, *errors):
+        return patch.object(validate_code, "_call_openai_chat", side_effect=list(errors))
+
+    def test_retries_transient_errors_then_succeeds(self):
+        with self._errors(
+            validate_code.OpenAIAPIError("rate limited", 429),
+            validate_code.OpenAIAPIError("connection reset"),
+            '{"tasks": []}',
+        ) as chat, patch.object(validate_code.time, "sleep") as sleep:
+            assert validate_code._call_openai_chat_with_retry([]) == '{"tasks": []}'
+        assert chat.call_count == 3
+        assert sleep.call_count == 2
+        assert all(0 <= call.args[0] <= validate_code.RETRY_BASE_DELAY * 2 for call in sleep.call_args_list)
+
+    def test_honours_retry_after(self):
+        with self._errors(validate_code.OpenAIAPIError("slow down", 429, retry_after=7.0), "ok"), \
+                patch.object(validate_code.time, "sleep") as sleep:
+            assert validate_code._call_openai_chat_with_retry([]) == "ok"
+        sleep.assert_called_once_with(7.0)
+
+    def test_non_retryable_raises_immediately(self):
+        with self._errors(validate_code.OpenAIAPIError("bad request", 400)) as chat, \
+                patch.object(validate_code.time, "sleep") as sleep:
+            with pytest.raises(validate_code.OpenAIAPIError, match="bad request"):
+                validate_code._call_openai_chat_with_retry([])
+        assert chat.call_count == 1
+        sleep.assert_not_called()
+
+    def test_gives_up_after_attempts(self):
+        errors = [validate_code.OpenAIAPIError("unavailable", 503) for _ in range(3)]
+        with self._errors(*errors) as chat, patch.object(validate_code.time, "sleep"):
+            with pytest.raises(validate_code.OpenAIAPIError):
+                validate_code._call_openai_chat_with_retry([], attempts=3)
+        assert chat.call_count == 3
+
+    def test_chat_response_parsed_from_bytes(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        body = json.dumps({"choices": [{"message": {"content": '{"tasks": []}'}}]}).encode()
+        with patch.object(validate_code, "_openai_request", return_value=body):
+            assert validate_code._call_openai_chat([], model="gpt-test") == '{"tasks": []}'
+
+    def test_parse_retry_after(self):
+        assert validate_code._parse_retry_after("3") == 3.0
+        assert validate_code._parse_retry_after(None) is None
+        assert validate_code._parse_retry_after("garbage") is None
+        assert validate_code._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers = []
+    drop_after_response = False
+
+    def _reply(self):
+        type(self).peers.append(self.client_address)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        status, body = (429, b"slow down") if self.path == "/limited" else (200, b'{"ok": true}')
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "2")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Simulate the server timing out an idle keep-alive socket.
+        self.close_connection = type(self).drop_after_response
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOpenAIRequestTransport:
+    @pytest.fixture
+    def server(self, monkeypatch):
+        for var in ("http_proxy", "HTTP_PROXY", "all_proxy", "ALL_PROXY"):
+            monkeypatch.delenv(var, raising=False)
+        _KeepAliveHandler.peers = []
+        _KeepAliveHandler.drop_after_response = False
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+        httpd.shutdown()
+        httpd.server_close()
+        validate_code._drop_http_connection("http", f"127.0.0.1:{httpd.server_address[1]}")
+
+    def test_connection_reused_across_calls(self, server):
+        for _ in range(3):
+            assert validate_code._openai_request(f"{server}/chat", "sk", data=b"{}") == b'{"ok": true}'
+        assert len({peer for peer in _KeepAliveHandler.peers}) == 1
+        assert len(_KeepAliveHandler.peers) == 3
+
+    def test_error_status_maps_to_api_error(self, server):
+        with pytest.raises(validate_code.OpenAIAPIError) as exc:
+            validate_code._openai_request(f"{server}/limited", "sk")
+        assert exc.value.status == 429
+        assert exc.value.retry_after == 2.0
+        assert "slow down" in str(exc.value)
+
+    def test_stale_keepalive_socket_is_replayed(self, server):
+        _KeepAliveHandler.drop_after_response = True
+        assert validate_code._openai_request(f"{server}/chat", "sk") == b'{"ok": true}'
+        assert validate_code._openai_request(f"{server}/chat", "sk") == b'{"ok": true}'
+        assert len({peer for peer in _KeepAliveHandler.peers}) == 2
+
+    def test_connection_refused(self):
+        with pytest.raises(validate_code.OpenAIAPIError) as exc:
+            validate_code._openai_request("http://127.0.0.1:9/chat", "sk", timeout=2)
+        assert exc.value.status is None
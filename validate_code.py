@@ -2,29 +2,81 @@
 from __future__ import annotations
 
 import argparse
+import email.utils
 import fnmatch
 import glob
+import hashlib
+import http.client
 import json
 import os
+import random
+import re
 import subprocess
 import sys
-import textwrap
+import tempfile
+import threading
 import time
 import urllib.error
+import urllib.parse
 import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 try:
     import yaml  # Optional, for YAML task files
 except Exception:
     yaml = None
 
+try:
+    import tiktoken  # Optional, token-aware code truncation
+except Exception:
+    tiktoken = None
+
+try:
+    import orjson  # Optional, faster decoding of API responses
+except Exception:
+    orjson = None
+
+# Both accept the raw response bytes, so bodies are never decoded to str first.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps_bytes(value: Any) -> bytes:
+    """Compact UTF-8 JSON; indentation only costs the model tokens."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _json_dumps(value: Any) -> str:
+    return _json_dumps_bytes(value).decode("utf-8")
+
+
+def _json_report_default(value: Any) -> Any:
+    if isinstance(value, Finding):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_report_bytes(payload: Dict[str, Any]) -> bytes:
+    """Indented UTF-8 JSON for the --json report; Findings serialize in place."""
+    if orjson is not None:
+        # orjson walks dataclasses natively, so no per-finding dict is built.
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, indent=2, default=_json_report_default).encode("utf-8")
+
 
 # ===================== Data types =====================
 
-@dataclass
+# slots= needs Python 3.10; older interpreters just keep the per-instance dict.
+_DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(eq=False, **_DATACLASS_SLOTS)
 class Finding:
     task: str
     file: str
@@ -46,14 +98,16 @@ class Finding:
 
 # ===================== Utilities ======================
 
-TEXT_EXT_BLOCKLIST = {".png", ".jpg", ".jpeg", ".gif", ".pdf", ".zip", ".gz", ".tar", ".rar", ".bmp", ".ico"}
+TEXT_EXT_BLOCKLIST = frozenset({".png", ".jpg", ".jpeg", ".gif", ".pdf", ".zip", ".gz", ".tar", ".rar", ".bmp", ".ico"})
 
 DEFAULT_OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 DEFAULT_OPENAI_MODEL: Optional[str] = None
 DEFAULT_MAX_CODE_CHARS = 8000
+DEFAULT_MAX_CODE_TOKENS: Optional[int] = None
 OPENAI_API_URL = DEFAULT_OPENAI_API_URL
 OPENAI_MODEL = DEFAULT_OPENAI_MODEL
 MAX_CODE_CHARS = DEFAULT_MAX_CODE_CHARS
+MAX_CODE_TOKENS = DEFAULT_MAX_CODE_TOKENS
 
 
 def read_text(p: Path) -> str:
@@ -63,6 +117,19 @@ def read_text(p: Path) -> str:
         return ""
 
 
+def read_source(p: Path) -> Tuple[str, str]:
+    """Read a file once, returning its decoded text and the SHA-256 of its bytes."""
+    with open(p, "rb") as fh:
+        data = fh.read()
+    try:
+        code = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return "", hashlib.sha256(b"").hexdigest()
+    # Valid UTF-8 round-trips exactly, so hashing the raw bytes matches
+    # hashing code.encode("utf-8") without a second encode pass.
+    return code, hashlib.sha256(data).hexdigest()
+
+
 def list_changed_files_git(base: str, head: str) -> List[Path]:
     try:
         res = subprocess.run(
@@ -77,6 +144,61 @@ def list_changed_files_git(base: str, head: str) -> List[Path]:
         return []
 
 
+def _scan_files(root: str, recursive: bool) -> Iterator[str]:
+    # Same paths, order and hidden-name skipping as glob's "root/*" and
+    # "root/**", but file/dir checks come from DirEntry's cached type
+    # instead of a stat per match.
+    with os.scandir(root) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        path = os.path.join(root, entry.name)
+        if entry.is_file():
+            yield path
+        elif recursive and entry.is_dir():
+            yield from _scan_files(path, True)
+
+
+def _scan_root(token: str) -> Optional[Tuple[str, bool]]:
+    for suffix, recursive in (("/**", True), ("/*", False)):
+        if token.endswith(suffix):
+            root = token[: -len(suffix)]
+            if root and not glob.has_magic(root) and os.path.isdir(root):
+                return root, recursive
+    return None
+
+
+def expand_file_args(tokens: List[str]) -> List[Path]:
+    """Expand --files globs into existing files, first occurrence wins."""
+    seen: Set[str] = set()
+    files: List[Path] = []
+
+    def add(candidate: str, known_file: bool = False) -> None:
+        # normpath folds spellings like "./a.py" and "src//a.py" together.
+        key = os.path.normpath(candidate)
+        if key in seen:
+            return
+        seen.add(key)
+        path = Path(candidate)
+        if known_file or path.is_file():
+            files.append(path)
+
+    for token in tokens:
+        scan = _scan_root(token)
+        if scan is not None:
+            for candidate in _scan_files(*scan):
+                add(candidate, known_file=True)
+            continue
+        matched = False
+        for candidate in glob.iglob(token, recursive=True):
+            matched = True
+            add(candidate)
+        if not matched:
+            add(token)
+    return files
+
+
 def load_tasks(tasks_path: Path) -> Any:
     text = read_text(tasks_path)
     if tasks_path.suffix.lower() in {".yml", ".yaml"}:
@@ -120,11 +242,22 @@ def _convert_guardian_task(task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
+@lru_cache(maxsize=1024)
+def _glob_regex(globs: Tuple[str, ...]) -> "re.Pattern[str]":
+    # One alternation per glob list, translated and compiled once, instead of
+    # an fnmatch() call (normcase + translation-cache lookup) per pattern.
+    return re.compile("|".join(fnmatch.translate(os.path.normcase(pat)) for pat in globs))
+
+
+def _globs_match(globs: Any, rel_path: str) -> bool:
+    return _glob_regex(tuple(globs)).match(os.path.normcase(rel_path)) is not None
+
+
 def _rule_applies_to_file(rule: Dict[str, Any], rel_path: str) -> bool:
     globs = rule.get("file_globs")
     if not globs:
         return True
-    return any(fnmatch.fnmatch(rel_path, pat) for pat in globs)
+    return _globs_match(globs, rel_path)
 
 
 def _rule_name(rule: Dict[str, Any]) -> str:
@@ -159,7 +292,7 @@ def load_env_file(dotenv_path: Path) -> None:
 
 
 def refresh_openai_settings() -> None:
-    global OPENAI_API_URL, OPENAI_MODEL, MAX_CODE_CHARS
+    global OPENAI_API_URL, OPENAI_MODEL, MAX_CODE_CHARS, MAX_CODE_TOKENS
     OPENAI_API_URL = os.environ.get("OPENAI_API_URL", DEFAULT_OPENAI_API_URL)
     OPENAI_MODEL = os.environ.get("OPENAI_MODEL", DEFAULT_OPENAI_MODEL)
     max_chars_val = os.environ.get("VALIDATOR_MAX_CODE_CHARS")
@@ -170,6 +303,13 @@ def refresh_openai_settings() -> None:
             MAX_CODE_CHARS = int(max_chars_val)
         except ValueError:
             MAX_CODE_CHARS = DEFAULT_MAX_CODE_CHARS
+    max_tokens_val = os.environ.get("VALIDATOR_MAX_CODE_TOKENS")
+    try:
+        MAX_CODE_TOKENS = int(max_tokens_val) if max_tokens_val else DEFAULT_MAX_CODE_TOKENS
+    except ValueError:
+        MAX_CODE_TOKENS = DEFAULT_MAX_CODE_TOKENS
+    if MAX_CODE_TOKENS is not None and MAX_CODE_TOKENS <= 0:
+        MAX_CODE_TOKENS = DEFAULT_MAX_CODE_TOKENS
 
 
 refresh_openai_settings()
@@ -188,8 +328,41 @@ AI_SYSTEM_PROMPT = (
 )
 
 
+@lru_cache(maxsize=8)
+def _token_encoding(model: Optional[str]) -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _truncate_code_tokens(code: str, budget: int, encoding: Any) -> Tuple[str, bool]:
+    # Every BPE token covers at least one UTF-8 byte, so short inputs fit
+    # without encoding them.
+    if len(code.encode("utf-8")) <= budget:
+        return code, False
+    tokens = encoding.encode(code, disallowed_special=())
+    if len(tokens) <= budget:
+        return code, False
+    head = budget // 2
+    tail = budget - head
+    snippet = encoding.decode(tokens[:head]) + "\n...\n" + encoding.decode(tokens[-tail:])
+    return snippet, True
+
+
 def _truncate_code(code: str, limit: Optional[int] = None) -> Tuple[str, bool]:
+    """Trim code to the prompt budget, keeping the head and tail.
+
+    An explicit ``limit`` is in characters. Otherwise VALIDATOR_MAX_CODE_TOKENS
+    applies when set and tiktoken is installed, falling back to
+    VALIDATOR_MAX_CODE_CHARS.
+    """
     if limit is None:
+        encoding = _token_encoding(OPENAI_MODEL) if MAX_CODE_TOKENS else None
+        if encoding is not None:
+            return _truncate_code_tokens(code, MAX_CODE_TOKENS, encoding)
         limit = MAX_CODE_CHARS
     if len(code) <= limit:
         return code, False
@@ -199,13 +372,40 @@ def _truncate_code(code: str, limit: Optional[int] = None) -> Tuple[str, bool]:
     return snippet, True
 
 
+AI_MULTI_FILE_SYSTEM_PROMPT = (
+    "You are CodeGuardian, an exacting code-compliance reviewer. "
+    "You receive a JSON array of tasks and a JSON array of files; decide for every file whether it satisfies each task. "
+    "When REFERENCE DOCUMENTATION is provided, ground your decisions in those specific policy excerpts. "
+    "Cite the relevant doc section in your explanation when a reference supports your finding. "
+    "Always respond with a JSON object that contains a 'tasks' array with one entry per (file, task) pair. "
+    "Each entry must include: 'fileRef' (the file's integer), 'internalRef' (the task's integer), 'compliant' (boolean), "
+    "'explanation' (string), 'citations' (array of doc_id strings used), "
+    "and 'violations' (array of {message,line,column,fix}). Line/column numbers are 1-indexed; use null when unknown."
+)
+
+
+def _append_rag_context(user_parts: List[str], rag_context: Optional[List[Dict[str, Any]]]) -> None:
+    if not rag_context:
+        return
+    user_parts.append("REFERENCE DOCUMENTATION (retrieved from company policy docs):")
+    for i, ctx in enumerate(rag_context):
+        doc_id = ctx.get("doc_id", f"doc_{i}")
+        score = ctx.get("score", 0)
+        text = ctx.get("text", "")
+        user_parts.append(f"--- [{doc_id}] (relevance score: {score:.2f}) ---")
+        user_parts.append(text)
+        user_parts.append("")
+    user_parts.append("Use the above references to ground your compliance decisions.")
+    user_parts.append("")
+
+
 def _build_ai_messages(
     task_payloads: List[Dict[str, Any]],
     file_rel: str,
     code: str,
     rag_context: Optional[List[Dict[str, Any]]] = None,
 ) -> List[Dict[str, str]]:
-    tasks_json = json.dumps(task_payloads, indent=2, ensure_ascii=False)
+    tasks_json = _json_dumps(task_payloads)
     code_snippet, truncated = _truncate_code(code)
     language = Path(file_rel).suffix.lstrip(".") or "text"
     user_parts = [
@@ -215,17 +415,7 @@ def _build_ai_messages(
     ]
 
     # Inject RAG-retrieved document context when available
-    if rag_context:
-        user_parts.append("REFERENCE DOCUMENTATION (retrieved from company policy docs):")
-        for i, ctx in enumerate(rag_context):
-            doc_id = ctx.get("doc_id", f"doc_{i}")
-            score = ctx.get("score", 0)
-            text = ctx.get("text", "")
-            user_parts.append(f"--- [{doc_id}] (relevance score: {score:.2f}) ---")
-            user_parts.append(text)
-            user_parts.append("")
-        user_parts.append("Use the above references to ground your compliance decisions.")
-        user_parts.append("")
+    _append_rag_context(user_parts, rag_context)
 
     user_parts.extend([
         f"File: {file_rel}",
@@ -244,40 +434,222 @@ def _build_ai_messages(
     ]
 
 
-def _call_openai_chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
+def _build_ai_messages_multi(
+    task_payloads: List[Dict[str, Any]],
+    files: List[Tuple[str, str]],
+    rag_context: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, str]]:
+    """Build one request covering several (file_rel, code) pairs that share a task list.
+
+    The task list and system prompt are sent once; each file is tagged with
+    its position as 'fileRef' so results can be split back per file.
+    """
+    files_payload = []
+    any_truncated = False
+    for file_ref, (file_rel, code) in enumerate(files):
+        code_snippet, truncated = _truncate_code(code)
+        any_truncated = any_truncated or truncated
+        files_payload.append({
+            "fileRef": file_ref,
+            "path": file_rel,
+            "language": Path(file_rel).suffix.lstrip(".") or "text",
+            "code": code_snippet,
+        })
+    user_parts = [
+        "Tasks JSON:",
+        _json_dumps(task_payloads),
+        "",
+    ]
+    _append_rag_context(user_parts, rag_context)
+    user_parts.extend([
+        "Files JSON:",
+        _json_dumps(files_payload),
+        "Return JSON with a 'tasks' array holding one entry per fileRef and internalRef pair.",
+    ])
+    if any_truncated:
+        user_parts.append("NOTE: Some sources were truncated for length; focus on the visible code.")
+    return [
+        {"role": "system", "content": AI_MULTI_FILE_SYSTEM_PROMPT},
+        {"role": "user", "content": "\n".join(user_parts)},
+    ]
+
+
+def _openai_credentials(model: Optional[str] = None) -> Tuple[str, str]:
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("Set OPENAI_API_KEY in your environment to run AI-based validation.")
     model_name = model or OPENAI_MODEL
     if not model_name:
         raise RuntimeError("Set OPENAI_MODEL in your .env (e.g., OPENAI_MODEL=gpt-4o-mini).")
-    payload = {
+    return api_key, model_name
+
+
+def _chat_payload(messages: List[Dict[str, str]], model_name: str) -> Dict[str, Any]:
+    return {
         "model": model_name,
         "messages": messages,
         "response_format": {"type": "json_object"},
     }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        OPENAI_API_URL,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-    )
+
+
+OPENAI_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class OpenAIAPIError(RuntimeError):
+    """OpenAI call failure; status is None for connection-level errors."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRYABLE_STATUS
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
     try:
-        with urllib.request.urlopen(req, timeout=90) as resp:
-            body = resp.read().decode("utf-8")
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+# One keep-alive connection per (thread, scheme, host): pool workers each
+# reuse their own socket instead of a fresh TCP + TLS handshake per call.
+_HTTP_LOCAL = threading.local()
+# A server closing an idle keep-alive socket surfaces as one of these before
+# any response arrives; the request is then replayed once on a new socket.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+def _http_connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    connections = getattr(_HTTP_LOCAL, "connections", None)
+    if connections is None:
+        connections = _HTTP_LOCAL.connections = {}
+    conn = connections.get((scheme, netloc))
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = connections[(scheme, netloc)] = conn_cls(netloc, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_http_connection(scheme: str, netloc: str) -> None:
+    conn = getattr(_HTTP_LOCAL, "connections", {}).pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _proxied(parts: urllib.parse.SplitResult) -> bool:
+    return bool(urllib.request.getproxies().get(parts.scheme)) and not urllib.request.proxy_bypass(parts.hostname or "")
+
+
+def _urllib_request(url: str, headers: Dict[str, str], data: Optional[bytes], timeout: float) -> bytes:
+    req = urllib.request.Request(url, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read()
     except urllib.error.HTTPError as exc:
         detail = exc.read().decode("utf-8", "ignore")
-        raise RuntimeError(f"OpenAI API error {exc.code}: {detail.strip()}") from exc
+        retry_after = _parse_retry_after(exc.headers.get("Retry-After") if exc.headers else None)
+        raise OpenAIAPIError(f"OpenAI API error {exc.code}: {detail.strip()}", exc.code, retry_after) from exc
     except urllib.error.URLError as exc:
-        raise RuntimeError(f"Failed to call OpenAI API: {exc}") from exc
-    parsed = json.loads(body)
+        raise OpenAIAPIError(f"Failed to call OpenAI API: {exc}") from exc
+
+
+def _openai_request(
+    url: str,
+    api_key: str,
+    data: Optional[bytes] = None,
+    content_type: str = "application/json",
+    timeout: float = 90,
+) -> bytes:
+    headers = {
+        "Content-Type": content_type,
+        "Authorization": f"Bearer {api_key}",
+    }
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or _proxied(parts):
+        # http.client ignores *_PROXY settings; let urllib handle those.
+        return _urllib_request(url, headers, data, timeout)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    method = "POST" if data is not None else "GET"
+    for attempt in range(2):
+        conn = _http_connection(parts.scheme, parts.netloc, timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except _STALE_CONNECTION_ERRORS as exc:
+            _drop_http_connection(parts.scheme, parts.netloc)
+            if reused and attempt == 0:
+                continue
+            raise OpenAIAPIError(f"Failed to call OpenAI API: {exc}") from exc
+        except (http.client.HTTPException, OSError) as exc:
+            _drop_http_connection(parts.scheme, parts.netloc)
+            raise OpenAIAPIError(f"Failed to call OpenAI API: {exc}") from exc
+        if resp.will_close:
+            _drop_http_connection(parts.scheme, parts.netloc)
+        if resp.status >= 400:
+            detail = body.decode("utf-8", "ignore")
+            retry_after = _parse_retry_after(resp.getheader("Retry-After"))
+            raise OpenAIAPIError(f"OpenAI API error {resp.status}: {detail.strip()}", resp.status, retry_after)
+        return body
+    raise OpenAIAPIError("Failed to call OpenAI API: connection closed")
+
+
+def _openai_json(url: str, api_key: str, **kwargs: Any) -> Any:
+    return _json_loads(_openai_request(url, api_key, **kwargs))
+
+
+def _chat_content(parsed: Dict[str, Any]) -> str:
     try:
         return parsed["choices"][0]["message"]["content"]
-    except (KeyError, IndexError) as exc:
-        raise RuntimeError(f"Unexpected OpenAI response: {body}") from exc
+    except (KeyError, IndexError, TypeError) as exc:
+        raise RuntimeError(f"Unexpected OpenAI response: {parsed}") from exc
+
+
+def _call_openai_chat(messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
+    api_key, model_name = _openai_credentials(model)
+    data = _json_dumps_bytes(_chat_payload(messages, model_name))
+    return _chat_content(_openai_json(OPENAI_API_URL, api_key, data=data))
+
+
+def _call_openai_chat_with_retry(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    attempts: int = OPENAI_MAX_ATTEMPTS,
+) -> str:
+    # Exponential backoff with full jitter on 429/5xx and connection errors;
+    # a Retry-After header from the API takes precedence.
+    for attempt in range(attempts):
+        try:
+            return _call_openai_chat(messages, model)
+        except OpenAIAPIError as exc:
+            if not exc.retryable or attempt == attempts - 1:
+                raise
+            if exc.retry_after is not None:
+                delay = min(RETRY_MAX_DELAY, exc.retry_after)
+            else:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            time.sleep(delay)
+    raise RuntimeError("OpenAI call attempts must be at least 1.")
 
 
 def _as_int(value: Any, default: int) -> int:
@@ -322,10 +694,24 @@ def evaluate_tasks_with_ai(
     if not task_payloads:
         return []
     messages = _build_ai_messages(task_payloads, file_rel, code, rag_context=rag_context)
-    response_text = _call_openai_chat(messages)
+    return _parse_ai_tasks(_call_openai_chat_with_retry(messages))
+
+
+def evaluate_files_with_ai(
+    task_payloads: List[Dict[str, Any]],
+    files: List[Tuple[str, str]],
+    rag_context: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    if not task_payloads or not files:
+        return []
+    messages = _build_ai_messages_multi(task_payloads, files, rag_context=rag_context)
+    return _parse_ai_tasks(_call_openai_chat_with_retry(messages))
+
+
+def _parse_ai_tasks(response_text: str) -> List[Dict[str, Any]]:
     try:
-        ai_result = json.loads(response_text)
-    except json.JSONDecodeError as exc:
+        ai_result = _json_loads(response_text)
+    except ValueError as exc:
         raise RuntimeError(f"AI response was not valid JSON: {exc}") from exc
     tasks = ai_result.get("tasks")
     if not isinstance(tasks, list):
@@ -333,139 +719,540 @@ def evaluate_tasks_with_ai(
     return tasks
 
 
+# ===================== OpenAI Batch API ===============
+
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INITIAL = 5.0
+BATCH_POLL_MAX = 60.0
+BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _openai_api_base() -> str:
+    # Batch and file endpoints live next to chat/completions on the same host.
+    return OPENAI_API_URL.rsplit("/chat/completions", 1)[0]
+
+
+def _multipart_body(fields: Dict[str, str], filename: str, content: bytes) -> Tuple[bytes, str]:
+    boundary = f"----validate-code-{uuid.uuid4().hex}"
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/jsonl\r\n\r\n".encode("utf-8")
+    )
+    parts.append(content)
+    parts.append(f"\r\n--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _wait_for_batch(base: str, api_key: str, batch_id: str) -> Dict[str, Any]:
+    delay = BATCH_POLL_INITIAL
+    while True:
+        batch = _openai_json(f"{base}/batches/{batch_id}", api_key)
+        if batch.get("status") in BATCH_TERMINAL_STATES:
+            return batch
+        time.sleep(delay)
+        delay = min(delay * 2, BATCH_POLL_MAX)
+
+
+def batch_evaluate(
+    all_requests: List[Tuple[str, List[Dict[str, str]]]],
+    model: Optional[str] = None,
+) -> Dict[str, Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]]:
+    """Run chat requests through the OpenAI Batch API.
+
+    ``all_requests`` pairs a unique custom_id with its messages. Returns the
+    parsed 'tasks' array (or the error) for each custom_id once the batch
+    finishes; this blocks until then, up to the 24h completion window.
+    """
+    if not all_requests:
+        return {}
+    api_key, model_name = _openai_credentials(model)
+    base = _openai_api_base()
+    lines = [
+        _json_dumps_bytes({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _chat_payload(messages, model_name),
+        })
+        for custom_id, messages in all_requests
+    ]
+    body, content_type = _multipart_body({"purpose": "batch"}, "validate_code.jsonl", b"\n".join(lines))
+    upload = _openai_json(f"{base}/files", api_key, data=body, content_type=content_type)
+    batch = _openai_json(
+        f"{base}/batches",
+        api_key,
+        data=_json_dumps_bytes({
+            "input_file_id": upload["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": BATCH_COMPLETION_WINDOW,
+        }),
+    )
+    batch = _wait_for_batch(base, api_key, batch["id"])
+    if batch.get("status") != "completed":
+        raise RuntimeError(f"OpenAI batch {batch.get('id')} ended with status {batch.get('status')}")
+
+    results: Dict[str, Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]] = {}
+    for file_key in ("output_file_id", "error_file_id"):
+        file_id = batch.get(file_key)
+        if not file_id:
+            continue
+        content = _openai_request(f"{base}/files/{file_id}/content", api_key, timeout=300)
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            entry = _json_loads(line)
+            custom_id = entry.get("custom_id")
+            response = entry.get("response") or {}
+            try:
+                if entry.get("error") or response.get("status_code") != 200:
+                    detail = entry.get("error") or response.get("body")
+                    raise RuntimeError(f"OpenAI API error {response.get('status_code')}: {detail}")
+                results[custom_id] = (_parse_ai_tasks(_chat_content(response.get("body") or {})), None)
+            except Exception as exc:
+                results[custom_id] = (None, exc)
+    missing = RuntimeError("OpenAI batch returned no result for this file.")
+    for custom_id, _ in all_requests:
+        results.setdefault(custom_id, (None, missing))
+    return results
+
+
+# ===================== Result cache ===================
+
+DEFAULT_CACHE_DIRNAME = ".validate_cache"
+CACHE_FILENAME = "cache.json"
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """On-disk map from (code, task spec, context, model) hashes to AI task results.
+
+    Lookups and stores happen on the calling thread only; save() writes the
+    whole file atomically so an interrupted run never leaves it half-written.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.path = cache_dir / CACHE_FILENAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION and isinstance(data.get("entries"), dict):
+            self.entries = data["entries"]
+
+    @staticmethod
+    def key(code_digest: str, context_digest: str, summary: Dict[str, Any]) -> str:
+        # internalRef is positional, so leave it out to keep hits across rule reorders.
+        spec = {k: v for k, v in summary.items() if k != "internalRef"}
+        spec_json = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        material = "|".join((code_digest, context_digest, OPENAI_MODEL or "", spec_json))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        self.entries[key] = {k: v for k, v in result.items() if k not in ("internalRef", "fileRef")}
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=".cache-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"version": CACHE_VERSION, "entries": self.entries}, fh, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        self.dirty = False
+
+
+def _context_digest(rag_context: Optional[List[Dict[str, Any]]]) -> str:
+    refs = [[ctx.get("doc_id"), ctx.get("text")] for ctx in rag_context or []]
+    return hashlib.sha256(json.dumps(refs, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _job_cache_keys(code_digest: str, context_digest: str, applicable: List[Tuple[int, Any, Dict[str, Any]]]) -> Dict[int, str]:
+    return {idx: ResultCache.key(code_digest, context_digest, summary) for idx, _, summary in applicable}
+
+
 # ===================== Runner =========================
 
-def run_checks(tasks_cfg: Dict[str, Any], files: List[Path], repo_root: Path, retriever: Any = None) -> Tuple[List[Finding], Dict[str, Any]]:
+DEFAULT_CONCURRENCY = 8
+READ_WORKERS = 8
+
+
+def _gather_rag_context(
+    applicable: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+    code: str,
+    retriever: Any = None,
+) -> Optional[List[Dict[str, Any]]]:
+    # RAG context assembly: combine FAISS retrieval + linked source chunks,
+    # then rerank all candidates with a cross-encoder to get the top 3.
+    all_candidates = []
+    seen_texts = set()
+
+    # Source 1: Linked source chunks from tasks (direct lookup)
+    for _, rule, _ in applicable:
+        chunk_info = rule.get("source_chunk") or (rule.get("ai_spec") or {}).get("source_chunk")
+        if chunk_info and isinstance(chunk_info, dict):
+            text = chunk_info.get("text", "")
+            text_hash = hash(text)
+            if text_hash not in seen_texts and text.strip():
+                seen_texts.add(text_hash)
+                all_candidates.append({
+                    "doc_id": chunk_info.get("doc_id", "unknown"),
+                    "text": text,
+                    "source": "linked_chunk",
+                })
+
+    # Source 2: FAISS similarity search (retrieves additional relevant chunks)
+    if retriever is not None:
+        try:
+            task_descriptions = " ".join(
+                summary.get("description", "") for _, _, summary in applicable
+            )
+            faiss_results = retriever.query_for_code(code, task_descriptions, top_k=10)
+            for result in faiss_results:
+                text = result.get("text", "")
+                text_hash = hash(text)
+                if text_hash not in seen_texts and text.strip():
+                    seen_texts.add(text_hash)
+                    all_candidates.append({
+                        "doc_id": result.get("doc_id", "unknown"),
+                        "text": text,
+                        "source": "faiss_retrieval",
+                        "faiss_score": result.get("score", 0.0),
+                    })
+        except Exception:
+            pass
+
+    if not all_candidates:
+        return None
+    # Rerank all candidates with cross-encoder, take top 3
+    rerank_query = " ".join(
+        summary.get("description", "") for _, _, summary in applicable
+    )
+    try:
+        # Import reranker — try both path configurations
+        try:
+            from backend.app.rag.reranker import rerank as _rerank
+        except ImportError:
+            from app.rag.reranker import rerank as _rerank
+        return _rerank(rerank_query, all_candidates, top_k=3)
+    except (ImportError, Exception):
+        # Reranker not available — use candidates as-is
+        return all_candidates[:3]
+
+
+def _rule_buckets(rules: List[Dict[str, Any]]) -> List[Tuple[Optional["re.Pattern[str]"], List[int]]]:
+    """Group rule indexes by identical file_globs, each with its compiled regex.
+
+    Task sets usually repeat the same fileTypes across many rules, so a file
+    needs one match per distinct glob list rather than one per rule. A None
+    regex means the rules apply to every file.
+    """
+    buckets: Dict[Tuple[str, ...], List[int]] = {}
+    for idx, rule in enumerate(rules):
+        buckets.setdefault(tuple(rule.get("file_globs") or ()), []).append(idx)
+    return [(_glob_regex(globs) if globs else None, idxs) for globs, idxs in buckets.items()]
+
+
+def _evaluate_file(
+    file_rel: str,
+    code: str,
+    applicable: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+    rag_context: Optional[List[Dict[str, Any]]],
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]:
+    try:
+        return evaluate_tasks_with_ai(
+            [summary for (_, _, summary) in applicable], file_rel, code, rag_context=rag_context
+        ), None
+    except Exception as exc:
+        return None, exc
+
+
+def _group_jobs(jobs: List[Tuple[str, str, Any, Any]], files_per_request: int) -> List[List[int]]:
+    """Group job indexes that share the same applicable rules, files_per_request at a time."""
+    if files_per_request <= 1:
+        return [[i] for i in range(len(jobs))]
+    groups: List[List[int]] = []
+    open_groups: Dict[Tuple[int, ...], List[int]] = {}
+    for i, (_, _, applicable, _) in enumerate(jobs):
+        fingerprint = tuple(idx for idx, _, _ in applicable)
+        group = open_groups.get(fingerprint)
+        if group is None or len(group) >= files_per_request:
+            group = open_groups[fingerprint] = []
+            groups.append(group)
+        group.append(i)
+    return groups
+
+
+def _merged_rag_context(contexts: List[Optional[List[Dict[str, Any]]]]) -> Optional[List[Dict[str, Any]]]:
+    merged = []
+    seen_texts = set()
+    for context in contexts:
+        for ctx in context or []:
+            text = ctx.get("text", "")
+            if text not in seen_texts:
+                seen_texts.add(text)
+                merged.append(ctx)
+    return merged or None
+
+
+def _group_request(jobs: List[Tuple[str, str, Any, Any]], group: List[int]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str]], Optional[List[Dict[str, Any]]]]:
+    applicable = jobs[group[0]][2]
+    files = [(jobs[i][0], jobs[i][1]) for i in group]
+    rag_context = _merged_rag_context([jobs[i][3] for i in group])
+    return [summary for (_, _, summary) in applicable], files, rag_context
+
+
+def _group_messages(jobs: List[Tuple[str, str, Any, Any]], group: List[int]) -> List[Dict[str, str]]:
+    if len(group) == 1:
+        file_rel, code, applicable, rag_context = jobs[group[0]]
+        return _build_ai_messages([summary for (_, _, summary) in applicable], file_rel, code, rag_context=rag_context)
+    task_payloads, files, rag_context = _group_request(jobs, group)
+    return _build_ai_messages_multi(task_payloads, files, rag_context=rag_context)
+
+
+def _split_group_outcome(
+    group: List[int],
+    outcome: Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]],
+) -> List[Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]]:
+    ai_task_results, error = outcome
+    if len(group) == 1 or error is not None:
+        return [outcome] * len(group)
+    per_file: List[List[Dict[str, Any]]] = [[] for _ in group]
+    for res in ai_task_results:
+        if not isinstance(res, dict):
+            continue
+        file_ref = _as_int(res.get("fileRef"), -1)
+        if 0 <= file_ref < len(group):
+            per_file[file_ref].append(res)
+    return [(results, None) for results in per_file]
+
+
+def _evaluate_group(
+    jobs: List[Tuple[str, str, Any, Any]],
+    group: List[int],
+) -> List[Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]]:
+    if len(group) == 1:
+        return [_evaluate_file(*jobs[group[0]])]
+    try:
+        outcome = (evaluate_files_with_ai(*_group_request(jobs, group)), None)
+    except Exception as exc:
+        outcome = (None, exc)
+    return _split_group_outcome(group, outcome)
+
+
+def _batch_outcomes(
+    jobs: List[Tuple[str, str, Any, Any]],
+    groups: List[List[int]],
+) -> List[List[Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]]]:
+    requests = [
+        (f"{jobs[group[0]][0]}#{idx}", _group_messages(jobs, group))
+        for idx, group in enumerate(groups)
+    ]
+    try:
+        results = batch_evaluate(requests)
+    except Exception as exc:
+        # Upload/creation/polling failures fail every file the same way a
+        # per-file call error would.
+        return [[(None, exc)] * len(group) for group in groups]
+    return [_split_group_outcome(group, results[custom_id]) for group, (custom_id, _) in zip(groups, requests)]
+
+
+def _collect_file_findings(
+    file_rel: str,
+    applicable: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+    ai_task_results: Optional[List[Dict[str, Any]]],
+    error: Optional[Exception],
+    findings: List[Finding],
+    failed_rule_indexes: Set[int],
+) -> None:
+    if error is not None:
+        message = f"AI evaluation failed: {error}"
+        for idx, rule, _ in applicable:
+            failed_rule_indexes.add(idx)
+            findings.append(Finding(_rule_name(rule), file_rel, 1, 0, message, rule.get("suggestedFix") or rule.get("fix")))
+        return
+    results_by_ref = {res.get("internalRef"): res for res in ai_task_results if isinstance(res, dict) and "internalRef" in res}
+    for idx, rule, summary in applicable:
+        result = results_by_ref.get(idx)
+        task_name = _rule_name(rule)
+        if not result:
+            failed_rule_indexes.add(idx)
+            findings.append(Finding(task_name, file_rel, 1, 0, "AI response missing for this task.", summary.get("suggestedFix")))
+            continue
+        compliant = bool(result.get("compliant"))
+        if compliant:
+            continue
+        failed_rule_indexes.add(idx)
+        violations = result.get("violations") or []
+        if isinstance(violations, list) and violations:
+            for violation in violations:
+                if not isinstance(violation, dict):
+                    continue
+                line = _as_int(violation.get("line"), 1)
+                column = _as_int(violation.get("column"), 0)
+                message = violation.get("message") or result.get("explanation") or summary.get("description") or "Task violation detected."
+                fix = violation.get("fix") or summary.get("suggestedFix") or rule.get("fix")
+                findings.append(Finding(task_name, file_rel, line, column, message, fix))
+            continue
+        explanation = result.get("explanation") or summary.get("description") or "Task violation detected."
+        fix = summary.get("suggestedFix") or rule.get("fix")
+        findings.append(Finding(task_name, file_rel, 1, 0, explanation, fix))
+
+
+def run_checks(
+    tasks_cfg: Dict[str, Any],
+    files: List[Path],
+    repo_root: Path,
+    retriever: Any = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch: bool = False,
+    files_per_request: int = 1,
+    cache_dir: Optional[Path] = None,
+) -> Tuple[List[Finding], Dict[str, Any]]:
     findings: List[Finding] = []
     rules = tasks_cfg.get("rules", [])
     failed_rule_indexes: Set[int] = set()
 
     global_includes = tasks_cfg.get("include")
     global_excludes = tasks_cfg.get("exclude")
-
-    def included(p: Path) -> bool:
-        try:
-            rel = p.resolve().relative_to(repo_root.resolve()).as_posix()
-        except ValueError:
-            rel = p.resolve().as_posix()
-        if global_includes and not any(fnmatch.fnmatch(rel, pat) for pat in global_includes):
+    include_re = _glob_regex(tuple(global_includes)) if global_includes else None
+    exclude_re = _glob_regex(tuple(global_excludes)) if global_excludes else None
+    rule_buckets = _rule_buckets(rules)
+    # Summaries depend only on the rule, so build them once and share them
+    # (read-only) across every file's request.
+    summaries = [_task_summary(rule, idx) for idx, rule in enumerate(rules)]
+
+    def included(rel_key: str) -> bool:
+        if include_re and not include_re.match(rel_key):
             return False
-        if global_excludes and any(fnmatch.fnmatch(rel, pat) for pat in global_excludes):
+        if exclude_re and exclude_re.match(rel_key):
             return False
         return True
 
+    repo_root_resolved = repo_root.resolve()
+    # Prepare every file's request up front (retrieval and reranking stay on
+    # this thread), then fan the network-bound AI calls out to a pool.
+    jobs = []
+    digests: List[Tuple[str, str]] = []
+    candidates = []
     for p in files:
         if not p.is_file():
             continue
         if p.suffix.lower() in TEXT_EXT_BLOCKLIST:
             continue
-        if not included(p):
-            continue
-        code = read_text(p)
+        # Resolve once per file; the relative path serves both the
+        # include/exclude filter and the rule matching below.
+        p_resolved = p.resolve()
         try:
-            file_rel = p.resolve().relative_to(repo_root.resolve()).as_posix()
+            file_rel = p_resolved.relative_to(repo_root_resolved).as_posix()
         except ValueError:
-            file_rel = p.resolve().as_posix()
-        applicable: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
-        for idx, rule in enumerate(rules):
-            if not _rule_applies_to_file(rule, file_rel):
-                continue
-            applicable.append((idx, rule, _task_summary(rule, idx)))
+            file_rel = p_resolved.as_posix()
+        rel_key = os.path.normcase(file_rel)
+        if not included(rel_key):
+            continue
+        applicable_idxs: List[int] = []
+        for globs_re, idxs in rule_buckets:
+            if globs_re is None or globs_re.match(rel_key):
+                applicable_idxs.extend(idxs)
+        applicable_idxs.sort()
+        applicable: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = [
+            (idx, rules[idx], summaries[idx]) for idx in applicable_idxs
+        ]
         if not applicable:
             continue
-        # RAG context assembly: combine FAISS retrieval + linked source chunks,
-        # then rerank all candidates with a cross-encoder to get the top 3.
-        rag_context = None
-        all_candidates = []
-        seen_texts = set()
-
-        # Source 1: Linked source chunks from tasks (direct lookup)
-        for _, rule, _ in applicable:
-            chunk_info = rule.get("source_chunk") or (rule.get("ai_spec") or {}).get("source_chunk")
-            if chunk_info and isinstance(chunk_info, dict):
-                text = chunk_info.get("text", "")
-                text_hash = hash(text)
-                if text_hash not in seen_texts and text.strip():
-                    seen_texts.add(text_hash)
-                    all_candidates.append({
-                        "doc_id": chunk_info.get("doc_id", "unknown"),
-                        "text": text,
-                        "source": "linked_chunk",
-                    })
-
-        # Source 2: FAISS similarity search (retrieves additional relevant chunks)
-        if retriever is not None:
-            try:
-                task_descriptions = " ".join(
-                    summary.get("description", "") for _, _, summary in applicable
-                )
-                faiss_results = retriever.query_for_code(code, task_descriptions, top_k=10)
-                for result in faiss_results:
-                    text = result.get("text", "")
-                    text_hash = hash(text)
-                    if text_hash not in seen_texts and text.strip():
-                        seen_texts.add(text_hash)
-                        all_candidates.append({
-                            "doc_id": result.get("doc_id", "unknown"),
-                            "text": text,
-                            "source": "faiss_retrieval",
-                            "faiss_score": result.get("score", 0.0),
-                        })
-            except Exception:
-                pass
-
-        # Rerank all candidates with cross-encoder, take top 3
-        if all_candidates:
-            rerank_query = " ".join(
-                summary.get("description", "") for _, _, summary in applicable
-            )
-            try:
-                # Import reranker — try both path configurations
-                try:
-                    from backend.app.rag.reranker import rerank as _rerank
-                except ImportError:
-                    from app.rag.reranker import rerank as _rerank
-                rag_context = _rerank(rerank_query, all_candidates, top_k=3)
-            except (ImportError, Exception):
-                # Reranker not available — use candidates as-is
-                rag_context = all_candidates[:3]
-
-        try:
-            ai_task_results = evaluate_tasks_with_ai(
-                [summary for (_, _, summary) in applicable], file_rel, code, rag_context=rag_context
-            )
-        except Exception as exc:
-            message = f"AI evaluation failed: {exc}"
-            for idx, rule, _ in applicable:
-                failed_rule_indexes.add(idx)
-                findings.append(Finding(_rule_name(rule), file_rel, 1, 0, message, rule.get("suggestedFix") or rule.get("fix")))
+        candidates.append((p, file_rel, applicable))
+
+    if candidates:
+        # Read files on a small pool while this thread assembles RAG context
+        # for the ones already loaded; map() yields in file order.
+        with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(candidates))) as readers:
+            sources = readers.map(read_source, [p for p, _, _ in candidates])
+            for (_, file_rel, applicable), (code, code_digest) in zip(candidates, sources):
+                rag_context = _gather_rag_context(applicable, code, retriever)
+                jobs.append((file_rel, code, applicable, rag_context))
+                digests.append((code_digest, _context_digest(rag_context)))
+
+    # Only rules without a cached result for this exact code/context go to the AI.
+    cache = ResultCache(cache_dir) if cache_dir is not None else None
+    cache_keys = (
+        [_job_cache_keys(code_digest, context_digest, job[2]) for job, (code_digest, context_digest) in zip(jobs, digests)]
+        if cache is not None
+        else [{} for _ in jobs]
+    )
+    cached_results: List[List[Dict[str, Any]]] = [[] for _ in jobs]
+    request_jobs = []
+    request_owners: List[List[int]] = []
+    # Files with identical content, language, missing rules and context
+    # (vendored copies, generated stubs) share one AI request per run.
+    request_index: Dict[Tuple[str, str, Tuple[int, ...], str], int] = {}
+    for i, (file_rel, code, applicable, rag_context) in enumerate(jobs):
+        missing = []
+        for entry in applicable:
+            hit = cache.get(cache_keys[i][entry[0]]) if cache is not None else None
+            if hit is None:
+                missing.append(entry)
+            else:
+                cached_results[i].append(dict(hit, internalRef=entry[0]))
+        if not missing:
             continue
-        results_by_ref = {res.get("internalRef"): res for res in ai_task_results if isinstance(res, dict) and "internalRef" in res}
-        for idx, rule, summary in applicable:
-            result = results_by_ref.get(idx)
-            task_name = _rule_name(rule)
-            if not result:
-                failed_rule_indexes.add(idx)
-                findings.append(Finding(task_name, file_rel, 1, 0, "AI response missing for this task.", summary.get("suggestedFix")))
-                continue
-            compliant = bool(result.get("compliant"))
-            if compliant:
-                continue
-            failed_rule_indexes.add(idx)
-            violations = result.get("violations") or []
-            if isinstance(violations, list) and violations:
-                for violation in violations:
-                    if not isinstance(violation, dict):
-                        continue
-                    line = _as_int(violation.get("line"), 1)
-                    column = _as_int(violation.get("column"), 0)
-                    message = violation.get("message") or result.get("explanation") or summary.get("description") or "Task violation detected."
-                    fix = violation.get("fix") or summary.get("suggestedFix") or rule.get("fix")
-                    findings.append(Finding(task_name, file_rel, line, column, message, fix))
-                continue
-            explanation = result.get("explanation") or summary.get("description") or "Task violation detected."
-            fix = summary.get("suggestedFix") or rule.get("fix")
-            findings.append(Finding(task_name, file_rel, 1, 0, explanation, fix))
+        code_digest, context_digest = digests[i]
+        fingerprint = (code_digest, Path(file_rel).suffix, tuple(idx for idx, _, _ in missing), context_digest)
+        n = request_index.get(fingerprint)
+        if n is None:
+            request_index[fingerprint] = len(request_jobs)
+            request_jobs.append((file_rel, code, missing, rag_context))
+            request_owners.append([i])
+        else:
+            request_owners[n].append(i)
+
+    groups = _group_jobs(request_jobs, files_per_request)
+    if groups and batch:
+        group_outcomes = _batch_outcomes(request_jobs, groups)
+    elif groups:
+        workers = max(1, min(concurrency, len(groups)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            group_outcomes = list(pool.map(lambda group: _evaluate_group(request_jobs, group), groups))
+    else:
+        group_outcomes = []
+    # Fully cached files never got a request: nothing requested, no results.
+    outcomes: List[Any] = [([], ([], None))] * len(jobs)
+    for group, group_outcome in zip(groups, group_outcomes):
+        for n, outcome in zip(group, group_outcome):
+            for owner in request_owners[n]:
+                outcomes[owner] = (request_jobs[n][2], outcome)
+
+    # Emit findings in file order regardless of caching or grouping.
+    for i, (file_rel, _, applicable, _) in enumerate(jobs):
+        requested, (ai_task_results, error) = outcomes[i]
+        if error is not None:
+            cached_refs = {res["internalRef"] for res in cached_results[i]}
+            cached_rules = [entry for entry in applicable if entry[0] in cached_refs]
+            _collect_file_findings(file_rel, cached_rules, cached_results[i], None, findings, failed_rule_indexes)
+            _collect_file_findings(file_rel, requested, None, error, findings, failed_rule_indexes)
+            continue
+        if cache is not None:
+            requested_refs = {idx for idx, _, _ in requested}
+            for res in ai_task_results:
+                if isinstance(res, dict) and res.get("internalRef") in requested_refs:
+                    cache.put(cache_keys[i][res["internalRef"]], res)
+        _collect_file_findings(file_rel, applicable, cached_results[i] + list(ai_task_results), None, findings, failed_rule_indexes)
+    if cache is not None:
+        cache.save()
 
     total_rules = len(rules)
     passed_rule_names = [_rule_name(rule) for idx, rule in enumerate(rules) if idx not in failed_rule_indexes]
@@ -490,10 +1277,14 @@ def format_human(findings: List[Finding], summary: Dict[str, Any]) -> str:
     lines.append("")
     if not findings:
         return "\n".join(lines)
+    append = lines.append
     for finding in findings:
-        lines.append(f"- [{finding.task}] {finding.file}:{finding.line}:{finding.column} — {finding.message}")
+        append(f"- [{finding.task}] {finding.file}:{finding.line}:{finding.column} — {finding.message}")
         if finding.fix:
-            lines.append(textwrap.indent("Fix:\n" + finding.fix.strip(), "    "))
+            # Same output as textwrap.indent(): blank lines stay unindented.
+            append("    Fix:")
+            for fix_line in finding.fix.strip().split("\n"):
+                append("    " + fix_line if fix_line.strip() else fix_line)
     return "\n".join(lines)
 
 
@@ -506,6 +1297,29 @@ def main():
     group.add_argument("--git-diff", nargs=2, metavar=("BASE", "HEAD"), help="Validate files changed between two git refs")
     ap.add_argument("--json", action="store_true", help="Emit JSON findings instead of human text")
     ap.add_argument("--out-file", help="Write the report to this file instead of stdout")
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum files evaluated in parallel (default {DEFAULT_CONCURRENCY})",
+    )
+    ap.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit all files through the OpenAI Batch API (half the cost; waits up to 24h for results)",
+    )
+    ap.add_argument(
+        "--files-per-request",
+        type=int,
+        default=1,
+        help="Send up to N files that share the same tasks in one AI request (default 1)",
+    )
+    ap.add_argument("--timings", action="store_true", help="Print per-phase timings to stderr (or set VALIDATOR_TIMINGS=1)")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and do not update the AI result cache")
+    ap.add_argument(
+        "--cache-dir",
+        help=f"Directory for the AI result cache (default ./{DEFAULT_CACHE_DIRNAME})",
+    )
     args = ap.parse_args()
 
     repo_root = Path.cwd()
@@ -518,27 +1332,22 @@ def main():
 
     files_start = time.perf_counter()
     if args.files:
-        files_strs: List[str] = []
-        for token in args.files:
-            matches = glob.glob(token, recursive=True)
-            if matches:
-                files_strs.extend(matches)
-            else:
-                files_strs.append(token)
-        seen: List[str] = []
-        files = []
-        for candidate in files_strs:
-            path = Path(candidate)
-            if path.is_file() and str(path) not in seen:
-                seen.append(str(path))
-                files.append(path)
+        files = expand_file_args(args.files)
     else:
         base, head = args.git_diff
         files = list_changed_files_git(base, head)
     files_collect_time = time.perf_counter() - files_start
 
     checks_start = time.perf_counter()
-    findings, summary = run_checks(tasks_cfg, files, repo_root)
+    findings, summary = run_checks(
+        tasks_cfg,
+        files,
+        repo_root,
+        concurrency=args.concurrency,
+        batch=args.batch,
+        files_per_request=args.files_per_request,
+        cache_dir=None if args.no_cache else Path(args.cache_dir or repo_root / DEFAULT_CACHE_DIRNAME),
+    )
     checks_time = time.perf_counter() - checks_start
     all_good = len(findings) == 0
 
@@ -555,31 +1364,28 @@ def main():
                 "total": summary.get("total_rules", 0),
                 "passed_names": summary.get("passed_rule_names", []),
             },
-            "findings": [finding.as_dict() for finding in findings],
+            "findings": findings,
         }
-        report = json.dumps(payload, indent=2)
+        report = _json_report_bytes(payload)
     else:
-        report = format_human(findings, summary)
+        report = format_human(findings, summary).encode("utf-8")
 
     if out_file_path:
-        text = report if report.endswith("\n") else report + "\n"
-        out_file_path.write_text(text, encoding="utf-8")
+        out_file_path.write_bytes(report if report.endswith(b"\n") else report + b"\n")
         if not want_json:
             print(f"Report written to {out_file_path} (text)")
     else:
-        print(report)
+        print(report.decode("utf-8"))
     render_time = time.perf_counter() - render_start
 
-    total_time = time.perf_counter() - start_time
-    timing_message = (
-        "Timings — tasks: {:.2f}s, files: {:.2f}s, checks: {:.2f}s, output: {:.2f}s, total: {:.2f}s".format(
-            tasks_load_time, files_collect_time, checks_time, render_time, total_time
+    if args.timings or os.environ.get("VALIDATOR_TIMINGS"):
+        total_time = time.perf_counter() - start_time
+        timing_message = (
+            "Timings — tasks: {:.2f}s, files: {:.2f}s, checks: {:.2f}s, output: {:.2f}s, total: {:.2f}s".format(
+                tasks_load_time, files_collect_time, checks_time, render_time, total_time
+            )
         )
-    )
-    if want_json:
         print(timing_message, file=sys.stderr)
-    else:
-        print(timing_message)
 
     # If you want the script to exit non-zero when findings exist, uncomment:
     # if findings: